@@ -0,0 +1,77 @@
+"""Compare the old row-wise chart serialization with services/chart_serializer.
+
+Run from backend/:  python -m benchmarks.chart_serialization [--groups 10000 1000000]
+
+The legacy path is what the chart routes did before: DataFrame.iterrows()
+to build the records, then FastAPI's jsonable_encoder and json.dumps. The
+new path builds the records column-wise and encodes them with orjson.
+"""
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from services.chart_serializer import grouped_records, point_records, chart_response
+
+
+def legacy_grouped(grouped: pd.Series) -> bytes:
+    frame = grouped.reset_index()
+    x_col, y_col = frame.columns
+    data = [
+        {"label": str(row[x_col]), "value": round(float(row[y_col]), 2)}
+        for _, row in frame.iterrows()
+    ]
+    return json.dumps(jsonable_encoder({"data": data})).encode()
+
+
+def legacy_points(sample: pd.DataFrame) -> bytes:
+    data = [
+        {"x": float(row["x"]), "y": float(row["y"])}
+        for _, row in sample.iterrows()
+    ]
+    return json.dumps(jsonable_encoder({"data": data})).encode()
+
+
+def vectorized_grouped(grouped: pd.Series) -> bytes:
+    return chart_response({"data": grouped_records(grouped)}).body
+
+
+def vectorized_points(sample: pd.DataFrame) -> bytes:
+    return chart_response({"data": point_records(sample["x"], sample["y"])}).body
+
+
+def timed(fn, arg) -> float:
+    start = time.perf_counter()
+    fn(arg)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, nargs="+", default=[10_000, 1_000_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'payload':<10}{'groups':>12}{'iterrows':>12}{'vectorized':>12}{'speedup':>10}")
+
+    for n in args.groups:
+        grouped = pd.Series(
+            rng.random(n) * 1000,
+            index=pd.Index([f"group_{i}" for i in range(n)], name="label"),
+            name="value",
+        )
+        points = pd.DataFrame({"x": rng.random(n), "y": rng.random(n)})
+
+        for name, legacy, vectorized, data in (
+            ("grouped", legacy_grouped, vectorized_grouped, grouped),
+            ("scatter", legacy_points, vectorized_points, points),
+        ):
+            assert json.loads(legacy(data.head(100))) == json.loads(vectorized(data.head(100)))
+            old = timed(legacy, data)
+            new = timed(vectorized, data)
+            print(f"{name:<10}{n:>12,}{old:>11.3f}s{new:>11.3f}s{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,17 @@ from fastapi.middleware.cors import CORSMiddleware
 from apscheduler.schedulers.background import BackgroundScheduler
 from database import create_tables, SessionLocal, Dataset
 from routes import upload, dataset, stats, query, auth, suggest_charts, custom_chart
-from services.data_processor import delete_dataset
+from services.data_processor import delete_dataset, get_cache_stats
+from services.chart_engine import chart_result_cache
+from services.histograms import sorted_column_cache
+from services.row_browser import row_view_cache
+from services.cube import cube_cache
+from services.llm_client import close_clients, get_llm_cache_stats
+from services import upload_jobs
 from datetime import datetime, timedelta
 from routes.generate_chart_from_prompt import router as prompt_chart_router
 from routes.correlations import router as correlation_router
+from routes.sql import router as sql_router
 import os
 
 app = FastAPI(title="AI Dashboard API")
@@ -35,6 +42,7 @@ app.include_router(suggest_charts.router, prefix="/api")
 app.include_router(custom_chart.router, prefix="/api")
 app.include_router(prompt_chart_router, prefix="/api")
 app.include_router(correlation_router, prefix="/api")
+app.include_router(sql_router, prefix="/api")
 
 def cleanup_old_datasets():
     db = SessionLocal()
@@ -55,6 +63,22 @@ def startup():
     scheduler.add_job(cleanup_old_datasets, "interval", hours=1)
     scheduler.start()
 
+@app.on_event("shutdown")
+async def shutdown():
+    upload_jobs.shutdown()
+    await close_clients()
+
 @app.get("/")
 def root():
-    return {"message": "AI Dashboard API is running"}
\ No newline at end of file
+    return {"message": "AI Dashboard API is running"}
+
+@app.get("/api/cache/stats")
+def cache_stats():
+    return {
+        "datasets": get_cache_stats(),
+        "charts": chart_result_cache.stats(),
+        "sorted_columns": sorted_column_cache.stats(),
+        "row_views": row_view_cache.stats(),
+        "cubes": cube_cache.stats(),
+        "llm": get_llm_cache_stats(),
+    }
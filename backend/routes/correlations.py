@@ -1,58 +1,75 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from services.data_processor import load_dataset
-import pandas as pd
+from services.data_processor import load_dataset, load_profile, get_numeric_columns
+from services.correlation_engine import top_correlations, top_associations, MAX_CATEGORIES
+from services.chart_engine import run_chart
+from services.chart_serializer import chart_response
 
 router = APIRouter()
 
 
 class CorrelationRequest(BaseModel):
     dataset_id: str
+    method: str = "pearson"
+    top_k: int = 3
+    threshold: float = 0.6
+    include_categorical: bool = False
 
 
 @router.post("/correlations")
 def detect_correlations(req: CorrelationRequest):
 
-    df = load_dataset(req.dataset_id)
+    if req.method not in ("pearson", "spearman"):
+        raise HTTPException(status_code=400, detail="method must be 'pearson' or 'spearman'.")
 
-    if df is None:
-        raise HTTPException(status_code=404, detail="Dataset not found")
-
-    numeric_df = df.select_dtypes(include=["int64", "float64"])
-
-    if numeric_df.shape[1] < 2:
-        return {"correlations": []}
-
-    corr_matrix = numeric_df.corr()
-
-    results = []
-
-    for i in range(len(corr_matrix.columns)):
-        for j in range(i + 1, len(corr_matrix.columns)):
+    # Booleans correlate as 0/1 alongside every integer and float width
+    numeric_columns = get_numeric_columns(req.dataset_id, include_bool=True)
 
-            col1 = corr_matrix.columns[i]
-            col2 = corr_matrix.columns[j]
+    if numeric_columns is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
 
-            corr_value = corr_matrix.iloc[i, j]
+    categorical_columns = []
+    if req.include_categorical:
+        profile = load_profile(req.dataset_id)
+        categorical_columns = [
+            col for col, col_stats in (profile or {}).get("stats", {}).items()
+            if col_stats["type"] == "categorical"
+            and col not in numeric_columns
+            and 2 <= col_stats["unique_count"] <= MAX_CATEGORIES
+        ]
 
-            if abs(corr_value) > 0.6:
+    if len(numeric_columns) < 2 and not categorical_columns:
+        return chart_response({"correlations": [], "associations": []})
 
-                sample = df[[col1, col2]].dropna().head(200)
+    df = load_dataset(req.dataset_id, columns=numeric_columns + categorical_columns)
 
-                data = [
-                    {"x": float(row[col1]), "y": float(row[col2])}
-                    for _, row in sample.iterrows()
-                ]
+    if df is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
 
-                results.append({
-                    "title": f"{col1} vs {col2}",
-                    "type": "scatter",
-                    "x": col1,
-                    "y": col2,
-                    "correlation": round(float(corr_value), 2),
-                    "data": data
-                })
+    pairs = top_correlations(
+        df, numeric_columns, method=req.method, top_k=req.top_k, threshold=req.threshold
+    ) if len(numeric_columns) >= 2 else []
 
-    results = sorted(results, key=lambda x: abs(x["correlation"]), reverse=True)
+    results = []
 
-    return {"correlations": results[:3]}
\ No newline at end of file
+    for pair in pairs:
+        col1, col2 = pair["x"], pair["y"]
+        results.append({
+            "title": f"{col1} vs {col2}",
+            "type": "scatter",
+            "x": col1,
+            "y": col2,
+            "method": pair["method"],
+            "correlation": round(pair["value"], 2),
+            # Same sample the chart engine serves for this scatter anywhere else
+            "data": run_chart(req.dataset_id, {"type": "scatter", "x": col1, "y": col2}),
+        })
+
+    associations = [
+        {**assoc, "value": round(assoc["value"], 2)}
+        for assoc in top_associations(
+            df, categorical_columns, numeric_columns, top_k=req.top_k, threshold=req.threshold
+        )
+    ] if categorical_columns else []
+
+    return chart_response({"correlations": results, "associations": associations})
@@ -1,12 +1,50 @@
-from fastapi import APIRouter, HTTPException
-from services.data_processor import load_dataset, get_dataset_info
+from fastapi import APIRouter, HTTPException, Query, Depends
+from sqlalchemy.orm import Session
+from database import get_db, Dataset
+from auth import get_current_user
+from services.data_processor import load_profile
+from services.filters import FilterError
+from services.row_browser import browse_rows, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+import json
 
 router = APIRouter()
 
 @router.get("/{dataset_id}")
 def get_dataset(dataset_id: str):
-    df = load_dataset(dataset_id)
-    if df is None:
+    info = load_profile(dataset_id)
+    if info is None:
         raise HTTPException(status_code=404, detail="Dataset not found.")
-    info = get_dataset_info(df)
-    return {"dataset_id": dataset_id, **info}
\ No newline at end of file
+    return {"dataset_id": dataset_id, **info}
+
+@router.get("/{dataset_id}/rows")
+def get_rows(
+    dataset_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    # Comma-separated columns, "-" for descending: "region,-revenue"
+    sort: str | None = None,
+    # JSON list of {"column", "op", "value"} conditions, all of which must hold
+    filters: str | None = None,
+    # Keyset pagination: the previous page's next_cursor; overrides offset
+    after: int | None = None,
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user),
+):
+    # Rows are only served to the dataset's owner
+    owned = db.query(Dataset.id).filter(Dataset.id == dataset_id, Dataset.user_id == user_id).count()
+    if not owned:
+        raise HTTPException(status_code=404, detail="Dataset not found.")
+
+    try:
+        parsed = json.loads(filters) if filters else None
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="filters must be a JSON list.")
+
+    try:
+        page = browse_rows(dataset_id, offset, limit, sort, parsed, after)
+    except FilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if page is None:
+        raise HTTPException(status_code=404, detail="Dataset not found.")
+    return page
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from services.data_processor import load_dataset
-import os
+from services.llm_client import chat_completion, astream_completion, llm_configured, LLMError
+from services.query_context import build_query_context
 import json
 import traceback
-import requests
 
 router = APIRouter()
 
@@ -18,47 +19,93 @@ def query_data(req: QueryRequest):
     print("=== QUERY RECEIVED ===")
     print("dataset_id:", req.dataset_id)
 
-    df = load_dataset(req.dataset_id)
-    print("df loaded:", df is not None)
+    context = build_query_context(req.dataset_id, req.question)
+    print("context loaded:", context is not None)
 
-    if df is None:
+    if context is None:
         raise HTTPException(status_code=404, detail="Dataset not found.")
 
-    api_key = os.getenv("GROQ_API_KEY")
-    print("api_key present:", bool(api_key))
+    print("llm configured:", llm_configured())
 
-    if not api_key:
+    if not llm_configured():
         raise HTTPException(status_code=500, detail="GROQ_API_KEY not set.")
 
-    print("building context...")
+    messages = build_messages(req, context)
 
-    # Build context about the dataset
-    col_info = []
-    for col in df.columns:
-        if df[col].dtype in ["int64", "float64"]:
-            col_info.append(
-                f"- {col} (numeric): min={df[col].min()}, max={df[col].max()}, "
-                f"mean={round(float(df[col].mean()), 2)}, sum={round(float(df[col].sum()), 2)}"
-            )
-        else:
-            top = df[col].value_counts().head(5).to_dict()
-            col_info.append(
-                f"- {col} (categorical): {len(df[col].unique())} unique values, top: {top}"
-            )
+    print("calling groq api...")
 
-    sample = df.head(5).fillna("").to_dict(orient="records")
+    try:
+        answer = chat_completion(
+            messages,
+            temperature=0.3,
+            max_tokens=512,
+            # Conversational answers are not reused across questions
+            cache=False,
+        )
+        print("answer received:", answer[:100])
+        return {"answer": answer}
 
-    system_prompt = f"""You are a data analyst assistant. The user has uploaded a CSV dataset and is asking questions about it.
+    except LLMError as e:
+        print("LLM ERROR:", str(e))
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Groq API error: {e}")
+    except Exception as e:
+        print("EXCEPTION:", str(e))
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/stream")
+async def query_data_stream(req: QueryRequest, request: Request):
+    """Same answer as query_data, relayed token by token as Server-Sent Events.
+
+    Events are `data: {"token": ...}` while the answer is generated, then a
+    final `event: done` (or `event: error` with a `detail`).
+    """
+    context = await run_in_threadpool(build_query_context, req.dataset_id, req.question)
+
+    if context is None:
+        raise HTTPException(status_code=404, detail="Dataset not found.")
+
+    if not llm_configured():
+        raise HTTPException(status_code=500, detail="GROQ_API_KEY not set.")
+
+    messages = build_messages(req, context)
 
-Dataset info:
-- Rows: {len(df)}
-- Columns: {list(df.columns)}
+    async def events():
+        tokens = astream_completion(messages, temperature=0.3, max_tokens=512)
+        try:
+            async for token in tokens:
+                # Stop pulling from the model as soon as nobody is listening
+                if await request.is_disconnected():
+                    print("query stream: client disconnected")
+                    return
+                yield _sse({"token": token})
+            yield _sse({}, event="done")
+        except LLMError as e:
+            print("LLM ERROR:", str(e))
+            yield _sse({"detail": f"Groq API error: {e}"}, event="error")
+        finally:
+            # Closes the upstream HTTP stream when we stop early
+            await tokens.aclose()
 
-Column details:
-{chr(10).join(col_info)}
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-Sample rows:
-{json.dumps(sample, indent=2)}
+
+def _sse(data: dict, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def build_messages(req: QueryRequest, context: str) -> list[dict]:
+
+    system_prompt = f"""You are a data analyst assistant. The user has uploaded a CSV dataset and is asking questions about it.
+
+{context}
 
 Answer the user's question based on this data. Be concise and specific.
 Use actual numbers from the data. If asked for comparisons or rankings, give exact values.
@@ -71,35 +118,4 @@ Keep answers to 2-4 sentences unless a list is clearly better."""
         messages.append({"role": msg["role"], "content": msg["content"]})
     messages.append({"role": "user", "content": req.question})
 
-    print("calling groq api...")
-
-    try:
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": "llama-3.3-70b-versatile",
-                "messages": [{"role": "system", "content": system_prompt}] + messages,
-                "max_tokens": 512,
-                "temperature": 0.3,
-            },
-            timeout=30,
-        )
-        print("STATUS CODE:", response.status_code)
-        print("RESPONSE:", response.text[:500])
-        response.raise_for_status()
-        answer = response.json()["choices"][0]["message"]["content"]
-        print("answer received:", answer[:100])
-        return {"answer": answer}
-
-    except requests.exceptions.HTTPError as e:
-        print("HTTP ERROR:", e.response.text)
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Groq API error: {e.response.text}")
-    except Exception as e:
-        print("EXCEPTION:", str(e))
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+    return [{"role": "system", "content": system_prompt}] + messages
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from database import get_db, Dataset
+from auth import get_current_user
+from services.data_processor import read_arrow_table
+from services.sql_engine import SQLQuery, SQLError, SQL_MAX_ROWS, SQL_PAGE_ROWS, SQL_TIMEOUT
+import orjson
+
+router = APIRouter()
+
+
+class SQLRequest(BaseModel):
+    # Table name used in the query -> dataset id, e.g. {"sales": "1a2b3c4d"}
+    datasets: dict[str, str]
+    query: str
+    max_rows: int = SQL_MAX_ROWS
+    page_rows: int = SQL_PAGE_ROWS
+    timeout: float = SQL_TIMEOUT
+
+
+@router.post("/sql")
+def run_sql(
+    req: SQLRequest,
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user),
+):
+    if not req.datasets:
+        raise HTTPException(status_code=400, detail="Name at least one dataset to query.")
+
+    # Only the caller's own datasets can be queried
+    ids = set(req.datasets.values())
+    owned = db.query(Dataset.id).filter(Dataset.id.in_(ids), Dataset.user_id == user_id).count()
+    if owned != len(ids):
+        raise HTTPException(status_code=404, detail="Dataset not found.")
+
+    tables = {}
+    for alias, dataset_id in req.datasets.items():
+        table = read_arrow_table(dataset_id)
+        if table is None:
+            raise HTTPException(status_code=404, detail="Dataset not found.")
+        tables[alias] = table
+
+    try:
+        query = SQLQuery(tables, req.query, req.max_rows, req.page_rows, req.timeout)
+    except SQLError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def events():
+        # columns, then one page event per batch of rows, then done (or error)
+        yield _sse({"columns": query.columns, "types": query.types}, event="columns")
+        try:
+            for rows in query.pages():
+                yield _sse({"rows": rows})
+            yield _sse({
+                "rows": query.rows,
+                "truncated": query.truncated,
+                "elapsed": round(query.elapsed, 3),
+            }, event="done")
+        except SQLError as e:
+            yield _sse({"detail": str(e)}, event="error")
+        finally:
+            query.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(data: dict, event: str | None = None) -> bytes:
+    prefix = f"event: {event}\n".encode() if event else b""
+    # orjson writes timestamps as ISO strings and NaN as null
+    return prefix + b"data: " + orjson.dumps(data, default=str) + b"\n\n"
@@ -1,65 +1,66 @@
-from fastapi import APIRouter, HTTPException
-from services.data_processor import load_dataset
+from fastapi import APIRouter, HTTPException, Query
+from services.data_processor import load_dataset, load_profile, load_cube
+from services.cube import cube_series
+from services.profiler import rounded
+from services.chart_serializer import grouped_records, chart_response
+from services.timeseries import BUCKETS, DEFAULT_MAX_POINTS, MAX_POINTS, aggregate_over_time
 
 router = APIRouter()
 
+# Values kept per breakdown, largest first
+BREAKDOWN_TOP_N = 10
+
 @router.get("/{dataset_id}")
-def get_stats(dataset_id: str):
-    df = load_dataset(dataset_id)
-    if df is None:
+def get_stats(
+    dataset_id: str,
+    bucket: str | None = None,
+    max_points: int = Query(DEFAULT_MAX_POINTS, ge=3, le=MAX_POINTS),
+    # The numeric column the pre-built charts break down
+    measure: str = "revenue",
+):
+    if bucket is not None and bucket not in BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Unsupported time bucket '{bucket}'.")
+
+    profile = load_profile(dataset_id)
+    if profile is None:
         raise HTTPException(status_code=404, detail="Dataset not found.")
 
     stats = {}
-    for col in df.columns:
-        col_stats = {
-            "type": "numeric" if df[col].dtype in ["int64", "float64"] else "categorical",
-            "null_count": int(df[col].isnull().sum()),
-            "unique_count": int(df[col].nunique()),
-        }
+    for col, col_stats in profile["stats"].items():
         if col_stats["type"] == "numeric":
-            col_stats.update({
-                "mean": round(float(df[col].mean()), 2),
-                "min": round(float(df[col].min()), 2),
-                "max": round(float(df[col].max()), 2),
-                "sum": round(float(df[col].sum()), 2),
-            })
-        else:
-            # Top 5 most frequent values for categorical
-            top = df[col].value_counts().head(5)
-            col_stats["top_values"] = [
-                {"value": str(k), "count": int(v)}
-                for k, v in top.items()
-            ]
+            col_stats = {
+                **col_stats,
+                **{k: rounded(col_stats[k]) for k in ("mean", "min", "max", "sum")},
+            }
         stats[col] = col_stats
 
     # Pre-built chart data for common charts
     charts = {}
+    if profile["stats"].get(measure, {}).get("type") != "numeric":
+        return chart_response({"stats": stats, "charts": charts})
 
-    # Revenue over time (if date + revenue columns exist)
-    if "date" in df.columns and "revenue" in df.columns:
-        df["date"] = df["date"].astype(str)
-        rev_by_date = df.groupby("date")["revenue"].sum().reset_index()
-        charts["revenue_over_time"] = rev_by_date.to_dict(orient="records")
+    # The measure over time (if a date column exists); dates are parsed at
+    # ingest, so they can be bucketed, and long series are downsampled
+    if "date" in profile["columns"]:
+        df = load_dataset(dataset_id, columns=["date", measure])
+        if df is not None:
+            by_date = aggregate_over_time(df["date"], df[measure], "sum", bucket, max_points)
+            charts[f"{measure}_over_time"] = grouped_records(
+                by_date, digits=None, label_key="date", value_key=measure
+            )
 
-    # Top products by revenue
-    if "product" in df.columns and "revenue" in df.columns:
-        top_products = (
-            df.groupby("product")["revenue"]
-            .sum()
-            .sort_values(ascending=False)
-            .head(8)
-            .reset_index()
-        )
-        charts["top_products"] = top_products.to_dict(orient="records")
-
-    # Revenue by category
-    if "category" in df.columns and "revenue" in df.columns:
-        by_cat = df.groupby("category")["revenue"].sum().reset_index()
-        charts["revenue_by_category"] = by_cat.to_dict(orient="records")
-
-    # Revenue by region
-    if "region" in df.columns and "revenue" in df.columns:
-        by_region = df.groupby("region")["revenue"].sum().reset_index()
-        charts["revenue_by_region"] = by_region.to_dict(orient="records")
+    # The measure per value of every cube dimension, e.g. revenue_by_region
+    cube = load_cube(dataset_id)
+    for dim in (cube["dimensions"] if cube is not None else {}):
+        by_dim = cube_series(cube, dim, measure, "sum")
+        if by_dim is None:
+            # Measures past CUBE_MAX_MEASURES are grouped here instead
+            df = load_dataset(dataset_id, columns=[dim, measure])
+            by_dim = df[measure].astype("float64").groupby(df[dim], observed=True).sum()
+        else:
+            # The cube keeps a group for missing labels; these charts never had one
+            by_dim = by_dim[by_dim.index != "nan"]
+        by_dim = by_dim.sort_values(ascending=False, kind="stable").head(BREAKDOWN_TOP_N)
+        charts[f"{measure}_by_{dim}"] = grouped_records(by_dim, digits=None, label_key=dim, value_key=measure)
 
-    return {"stats": stats, "charts": charts}
+    return chart_response({"stats": stats, "charts": charts})
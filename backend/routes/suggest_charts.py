@@ -1,56 +1,67 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from services.data_processor import load_dataset
+from services.llm_client import achat_completion, llm_configured
+from services.data_processor import load_profile
+from services.profiler import rounded
+from services.chart_engine import run_chart
+from services.chart_serializer import chart_response
 import os
 import json
-import requests
-import pandas as pd
-import numpy as np
+import asyncio
 
 router = APIRouter()
 
+# How many charts are built / explained at once, and how long a single
+# chart's insight may take before the chart is returned without one
+SUGGEST_CHART_CONCURRENCY = int(os.getenv("SUGGEST_CHART_CONCURRENCY", 4))
+CHART_INSIGHT_DEADLINE = float(os.getenv("CHART_INSIGHT_DEADLINE", 8))
+
 
 class SuggestRequest(BaseModel):
     dataset_id: str
 
 
 @router.post("/suggest-charts")
-def suggest_charts(req: SuggestRequest):
+async def suggest_charts(req: SuggestRequest):
 
-    df = load_dataset(req.dataset_id)
+    profile = await run_in_threadpool(load_profile, req.dataset_id)
 
-    if df is None:
+    if profile is None:
         raise HTTPException(status_code=404, detail="Dataset not found.")
 
-    api_key = os.getenv("GROQ_API_KEY")
-
-    if not api_key:
+    if not llm_configured():
         raise HTTPException(status_code=500, detail="GROQ_API_KEY not set.")
 
     # Build dataset summary for LLM
     col_info = []
 
-    for col in df.columns:
+    for col, col_stats in profile["stats"].items():
+
+        if col_stats["type"] == "numeric":
+
+            col_info.append(
+                f"{col} (numeric): min={col_stats['min']}, max={col_stats['max']}, mean={rounded(col_stats['mean'])}"
+            )
 
-        if pd.api.types.is_numeric_dtype(df[col]):
+        elif col_stats["type"] == "datetime":
 
             col_info.append(
-                f"{col} (numeric): min={df[col].min()}, max={df[col].max()}, mean={round(float(df[col].mean()),2)}"
+                f"{col} (datetime): from {col_stats['min']} to {col_stats['max']}"
             )
 
         else:
 
-            unique_count = df[col].nunique()
-            sample = list(df[col].value_counts().head(5).index)
+            sample = [v["value"] for v in col_stats["top_values"]]
 
             col_info.append(
-                f"{col} (categorical): {unique_count} unique values, examples: {sample}"
+                f"{col} (categorical): {col_stats['unique_count']} unique values, examples: {sample}"
             )
 
     prompt = f"""
 You are a data visualization expert.
 
-Dataset has {len(df)} rows and these columns:
+Dataset has {profile["rows"]} rows and these columns:
 {chr(10).join(col_info)}
 
 Suggest the 4 most insightful charts.
@@ -79,25 +90,12 @@ Return JSON only.
 
     try:
 
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": "llama-3.3-70b-versatile",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.1,
-                "max_tokens": 1000,
-            },
-            timeout=30,
+        content = await achat_completion(
+            [{"role": "user", "content": prompt}],
+            temperature=0.1,
+            max_tokens=1000,
         )
 
-        response.raise_for_status()
-
-        content = response.json()["choices"][0]["message"]["content"].strip()
-
         # Remove markdown if LLM returns it
         if content.startswith("```"):
             content = content.split("```")[1]
@@ -106,36 +104,13 @@ Return JSON only.
 
         suggestions = json.loads(content.strip())
 
-        charts = []
-
-        for suggestion in suggestions:
-
-            try:
+        semaphore = asyncio.Semaphore(SUGGEST_CHART_CONCURRENCY)
 
-                chart_data = build_chart_data(df, suggestion)
-
-                # Only return charts with valid data
-                if chart_data and isinstance(chart_data, list) and len(chart_data) > 0:
-
-                    chart = {
-                        "title": suggestion.get("title"),
-                        "type": suggestion.get("type"),
-                        "x": suggestion.get("x"),
-                        "y": suggestion.get("y"),
-                        "description": suggestion.get("description"),
-                        "data": chart_data
-                        }
-
-                    # Generate AI insight for the chart
-                    chart["insight"] = generate_chart_insight(chart, api_key)
-
-                    charts.append(chart)
-
-            except Exception as e:
-                print(f"Skipping chart {suggestion.get('title')}: {e}")
-                continue
+        results = await asyncio.gather(
+            *(build_chart(req.dataset_id, suggestion, semaphore) for suggestion in suggestions)
+        )
 
-        return {"charts": charts}
+        return chart_response({"charts": [chart for chart in results if chart is not None]})
 
     except Exception as e:
 
@@ -145,86 +120,43 @@ Return JSON only.
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def build_chart_data(df, suggestion):
+async def build_chart(dataset_id, suggestion, semaphore):
 
-    chart_type = suggestion.get("type")
-    x_col = suggestion.get("x")
-    y_col = suggestion.get("y")
-    aggregation = suggestion.get("aggregation", "none")
+    async with semaphore:
 
-    if x_col not in df.columns:
-        return None
+        try:
 
-    if y_col and y_col not in df.columns:
-        return None
+            chart_data = await run_in_threadpool(run_chart, dataset_id, suggestion)
 
-    # HISTOGRAM
-    if chart_type == "histogram":
+            # Only return charts with valid data
+            if not chart_data or not isinstance(chart_data, list):
+                return None
 
-        series = pd.to_numeric(df[x_col], errors="coerce").dropna()
+            chart = {
+                "title": suggestion.get("title"),
+                "type": suggestion.get("type"),
+                "x": suggestion.get("x"),
+                "y": suggestion.get("y"),
+                "description": suggestion.get("description"),
+                "data": chart_data
+                }
 
-        if series.empty:
+        except Exception as e:
+            print(f"Skipping chart {suggestion.get('title')}: {e}")
             return None
 
-        counts, bin_edges = np.histogram(series, bins=10)
-
-        return [
-            {
-                "label": f"{round(bin_edges[i],2)}-{round(bin_edges[i+1],2)}",
-                "value": int(counts[i])
-            }
-            for i in range(len(counts))
-        ]
-
-    # SCATTER
-    if chart_type == "scatter":
-
-        if not y_col:
-            return None
-
-        df[x_col] = pd.to_numeric(df[x_col], errors="coerce")
-        df[y_col] = pd.to_numeric(df[y_col], errors="coerce")
-
-        sample = df[[x_col, y_col]].dropna().head(200)
-
-        if sample.empty:
-            return None
-
-        return [
-            {"x": float(row[x_col]), "y": float(row[y_col])}
-            for _, row in sample.iterrows()
-        ]
-
-    # BAR / PIE / LINE
-
-    if not y_col or aggregation == "none":
-        return None
-
-    df[y_col] = pd.to_numeric(df[y_col], errors="coerce")
-
-    if aggregation == "sum":
-        grouped = df.groupby(x_col)[y_col].sum()
-
-    elif aggregation == "mean":
-        grouped = df.groupby(x_col)[y_col].mean().round(2)
-
-    elif aggregation == "count":
-        grouped = df.groupby(x_col)[y_col].count()
-
-    else:
-        grouped = df.groupby(x_col)[y_col].sum()
-
-    grouped = grouped.reset_index()
-
-    if grouped.empty:
-        return None
+        # Generate AI insight for the chart; a slow one is dropped, not waited on
+        try:
+            chart["insight"] = await asyncio.wait_for(
+                generate_chart_insight(chart), CHART_INSIGHT_DEADLINE
+            )
+        except asyncio.TimeoutError:
+            print(f"Insight for {chart['title']} missed the deadline")
+            chart["insight"] = None
 
-    return [
-        {"label": str(row[x_col]), "value": round(float(row[y_col]), 2)}
-        for _, row in grouped.iterrows()
-    ]
+        return chart
 
-def generate_chart_insight(chart, api_key):
+async def generate_chart_insight(chart):
 
     try:
 
@@ -239,24 +171,11 @@ Chart data: {chart['data'][:10]}
 Write a short 1-2 sentence insight.
 """
 
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": "llama-3.3-70b-versatile",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.3,
-                "max_tokens": 100,
-            },
-            timeout=20,
+        return await achat_completion(
+            [{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=100,
         )
 
-        response.raise_for_status()
-
-        return response.json()["choices"][0]["message"]["content"].strip()
-
     except:
         return None
\ No newline at end of file
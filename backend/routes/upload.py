@@ -1,12 +1,15 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from sqlalchemy.orm import Session
-from services.data_processor import parse_csv, save_dataset, get_dataset_info
+from fastapi.concurrency import run_in_threadpool
+from services.data_processor import (
+    ingest_csv, load_profile, STORAGE_DIR, UPLOAD_CHUNK_BYTES
+)
+from services.llm_client import chat_completion, llm_configured
+from services import upload_jobs
 from database import get_db, Dataset
 from auth import get_current_user
 import uuid
 import os
-import requests
-import pandas as pd
 
 router = APIRouter()
 
@@ -24,17 +27,18 @@ async def upload_csv(
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV files are supported.")
 
-    contents = await file.read()
+    dataset_id = str(uuid.uuid4())[:8]
+    upload_path = os.path.join(STORAGE_DIR, f"{dataset_id}.upload.csv")
 
     try:
 
-        dataset_id = str(uuid.uuid4())[:8]
+        # Copy the body to disk piece by piece instead of reading it into memory
+        with open(upload_path, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                out.write(chunk)
 
-        df = parse_csv(contents)
-
-        save_dataset(dataset_id, df)
-
-        info = get_dataset_info(df)
+        # Parsing is CPU bound; keep it off the event loop
+        await run_in_threadpool(ingest_csv, dataset_id, upload_path)
 
         record = Dataset(
             id=dataset_id,
@@ -45,17 +49,14 @@ async def upload_csv(
         db.add(record)
         db.commit()
 
-        summary = generate_dataset_summary(df)
+        # The data is durable now; profiling and the AI summary finish in the
+        # background and are reported through the status endpoint
+        upload_jobs.submit(dataset_id, file.filename, generate_dataset_summary)
 
         return {
             "id": dataset_id,
             "filename": file.filename,
-            "rows": info["rows"],
-            "columns": info["columns"],
-            "preview": info["preview"],
-            "column_types": info["column_types"],
-            "stats": info["stats"],
-            "summary": summary
+            "status": "queued",
         }
 
     except Exception as e:
@@ -64,53 +65,66 @@ async def upload_csv(
 
         raise HTTPException(status_code=500, detail=f"Failed to parse CSV: {str(e)}")
 
+    finally:
 
-def generate_dataset_summary(df):
+        if os.path.exists(upload_path):
+            os.remove(upload_path)
 
-    try:
 
-        api_key = os.getenv("GROQ_API_KEY")
+@router.get("/{dataset_id}/status")
+def upload_status(dataset_id: str):
 
-        if not api_key:
-            return None
+    status = upload_jobs.current_status(dataset_id)
+
+    if status is None:
+        raise HTTPException(status_code=404, detail="Upload not found.")
+
+    response = {"id": dataset_id, **status}
+
+    # Once processing is done the response carries everything the dashboard needs
+    if status.get("status") == "ready":
+        info = load_profile(dataset_id)
+        if info is None:
+            raise HTTPException(status_code=404, detail="Dataset not found.")
+        response.update({
+            "rows": info["rows"],
+            "columns": info["columns"],
+            "preview": info["preview"],
+            "column_types": info["column_types"],
+            "stats": info["stats"],
+        })
+
+    return response
 
-        column_info = []
 
-        for col in df.columns:
+def generate_dataset_summary(info):
 
-            if pd.api.types.is_numeric_dtype(df[col]):
-                column_info.append(f"{col} (numeric)")
-            else:
-                column_info.append(f"{col} (categorical)")
+    try:
+
+        if not llm_configured():
+            return None
+
+        column_info = [
+            f"{col} ({col_type})"
+            for col, col_type in info["column_types"].items()
+        ]
 
         prompt = f"""
 You are a data analyst.
 
 Describe this dataset in 1–2 sentences.
 
-Rows: {len(df)}
+Rows: {info["rows"]}
 Columns: {column_info}
 
 Explain what the dataset likely represents.
 """
 
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": "llama-3.3-70b-versatile",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.3,
-                "max_tokens": 80,
-            },
+        return chat_completion(
+            [{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=80,
         )
 
-        response.raise_for_status()
-
-        return response.json()["choices"][0]["message"]["content"].strip()
-
     except:
         return None
\ No newline at end of file
@@ -0,0 +1,328 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from services.data_processor import (
+    load_dataset, get_dataset_columns, load_zone_map, load_cube,
+    dataset_exists, forget_dataset, register_derived_cache,
+)
+from services.cube import cube_series
+from services.chart_serializer import grouped_records, point_records, histogram_records
+from services.histograms import BINNINGS, DEFAULT_BINS, MAX_BINS, histogram, sorted_values, sorted_column
+from services.filters import FilterError, normalize_filters, filter_columns, matching_rows
+from services.timeseries import BUCKETS, DEFAULT_MAX_POINTS, MAX_POINTS, aggregate_over_time
+
+# Every chart the API draws (custom, suggested, prompted) is executed here
+# from a normalized spec, and the resulting data is memoized per dataset
+# under a hash of that spec. The defaults match ChartBuilder's, so a
+# suggested chart the user re-creates there is served from the cache.
+
+CHART_TYPES = {"bar", "line", "pie", "scatter", "histogram"}
+AGGREGATIONS = {"sum", "mean", "count", "min", "max"}
+SCATTER_POINTS = 300
+MAX_SCATTER_POINTS = 10_000
+# Scatter "auto" mode switches from a point sample to a density grid above
+# this many plottable rows
+SCATTER_DENSITY_ROWS = int(os.getenv("SCATTER_DENSITY_ROWS", 100_000))
+DEFAULT_GRID = 50
+MAX_GRID = 500
+SCATTER_MODES = {"sample", "density", "auto"}
+
+CHART_CACHE_MAX_ENTRIES = int(os.getenv("CHART_CACHE_MAX_ENTRIES", 256))
+# Results with more records than this are returned but not kept
+CHART_CACHE_MAX_RECORDS = int(os.getenv("CHART_CACHE_MAX_RECORDS", 100_000))
+
+
+class ChartSpecError(ValueError):
+    """The spec cannot be drawn from this dataset; the message is user-facing."""
+
+
+def normalize_spec(spec: dict) -> dict:
+    """Canonical spec: known keys only, defaults filled in, irrelevant keys dropped.
+
+    Two specs that produce the same data normalize to the same dict.
+    """
+    chart_type = str(spec.get("type") or spec.get("chart_type") or "").lower()
+    if chart_type not in CHART_TYPES:
+        raise ChartSpecError(f"Unsupported chart type '{chart_type}'.")
+
+    x = spec.get("x")
+    if not x:
+        raise ChartSpecError("An X column is required.")
+
+    try:
+        filters = normalize_filters(spec.get("filters"))
+    except FilterError as e:
+        raise ChartSpecError(str(e))
+
+    if chart_type == "histogram":
+        binning = spec.get("binning") or "width"
+        if binning not in BINNINGS:
+            raise ChartSpecError(f"Unsupported histogram binning '{binning}'.")
+        bins = int(spec.get("bins") or DEFAULT_BINS)
+        return {
+            "type": chart_type,
+            "x": x,
+            "filters": filters,
+            "binning": binning,
+            # Freedman-Diaconis chooses its own bin count
+            "bins": min(max(bins, 1), MAX_BINS) if binning != "fd" else None,
+        }
+
+    y = spec.get("y")
+    if not y:
+        if chart_type == "scatter":
+            raise ChartSpecError("Scatter chart requires a Y column.")
+        raise ChartSpecError("This chart type requires a Y column.")
+
+    if chart_type == "scatter":
+        mode = spec.get("mode") or "sample"
+        if mode not in SCATTER_MODES:
+            raise ChartSpecError(f"Unsupported scatter mode '{mode}'.")
+        points = int(spec.get("points") or SCATTER_POINTS)
+        grid = int(spec.get("grid") or DEFAULT_GRID)
+        return {
+            "type": chart_type,
+            "x": x,
+            "y": y,
+            "filters": filters,
+            "mode": mode,
+            "points": min(max(points, 1), MAX_SCATTER_POINTS) if mode != "density" else None,
+            "grid": min(max(grid, 2), MAX_GRID) if mode != "sample" else None,
+        }
+
+    # Unknown aggregations (including "none") fall back to a sum
+    aggregation = spec.get("aggregation")
+    top_n = spec.get("top_n")
+    normalized = {
+        "type": chart_type,
+        "x": x,
+        "y": y,
+        "filters": filters,
+        "aggregation": aggregation if aggregation in AGGREGATIONS else "sum",
+        "sort": "asc" if spec.get("sort") == "asc" else "desc",
+        "top_n": int(top_n) if top_n else None,
+    }
+
+    if chart_type == "line":
+        # A line is drawn in axis order, so ranking options don't apply
+        del normalized["sort"], normalized["top_n"]
+        bucket = spec.get("bucket") or None
+        if bucket is not None and bucket not in BUCKETS:
+            raise ChartSpecError(f"Unsupported time bucket '{bucket}'.")
+        max_points = int(spec.get("max_points") or DEFAULT_MAX_POINTS)
+        normalized["bucket"] = bucket
+        normalized["max_points"] = min(max(max_points, 3), MAX_POINTS)
+
+    return normalized
+
+
+def spec_hash(spec: dict) -> str:
+    canonical = json.dumps(spec, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _numeric(series: pd.Series) -> pd.Series:
+    # Timestamps are not measures; treat them like any other non-numeric text
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return pd.Series(np.nan, index=series.index)
+    values = pd.to_numeric(series, errors="coerce")
+    # float32 storage is exact per value, but sums would accumulate in float32
+    return values.astype("float64") if values.dtype == np.float32 else values
+
+
+def _histogram(values: np.ndarray, spec: dict) -> list[dict]:
+    if not len(values):
+        raise ChartSpecError("Column must contain numeric values for histogram.")
+
+    counts, bin_edges = histogram(values, spec["bins"], spec["binning"])
+    return histogram_records(counts, bin_edges)
+
+
+def _sample_points(x: np.ndarray, y: np.ndarray, points: int) -> list[dict]:
+    if len(x) > points:
+        # Uniform sample without replacement, seeded so the same spec always
+        # draws the same points, and kept in file order
+        rows = np.sort(np.random.default_rng(0).choice(len(x), size=points, replace=False))
+        x, y = x[rows], y[rows]
+    return point_records(x, y)
+
+
+def _density_grid(x: np.ndarray, y: np.ndarray, grid: int) -> list[dict]:
+    """Non-empty cells of a grid x grid histogram as {x, y, count} at cell centers."""
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=grid)
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+
+    xi, yi = np.nonzero(counts)
+    return [
+        {"x": cx, "y": cy, "count": c}
+        for cx, cy, c in zip(
+            x_centers[xi].tolist(), y_centers[yi].tolist(), counts[xi, yi].astype(np.int64).tolist()
+        )
+    ]
+
+
+def _scatter(df: pd.DataFrame, spec: dict) -> list[dict]:
+    x = _numeric(df[spec["x"]]).to_numpy(dtype="float64", na_value=np.nan)
+    y = _numeric(df[spec["y"]]).to_numpy(dtype="float64", na_value=np.nan)
+
+    valid = np.isfinite(x) & np.isfinite(y)
+    x, y = x[valid], y[valid]
+
+    mode = spec["mode"]
+    if mode == "auto":
+        mode = "density" if len(x) > SCATTER_DENSITY_ROWS else "sample"
+
+    if mode == "density" and len(x):
+        return _density_grid(x, y, spec["grid"])
+    return _sample_points(x, y, spec["points"] or SCATTER_POINTS)
+
+
+def _aggregated(df: pd.DataFrame, spec: dict) -> list[dict]:
+    values = _numeric(df[spec["y"]])
+
+    if spec["type"] == "line" and pd.api.types.is_datetime64_any_dtype(df[spec["x"]]):
+        grouped = aggregate_over_time(
+            df[spec["x"]], values, spec["aggregation"], spec["bucket"], spec["max_points"]
+        )
+        return grouped_records(grouped)
+
+    grouper = values.groupby(df[spec["x"]], dropna=False, observed=True)
+    return _ranked(getattr(grouper, spec["aggregation"])(), spec)
+
+
+def _ranked(grouped: pd.Series, spec: dict) -> list[dict]:
+    if spec["type"] == "line":
+        # Groups come (from the group-by or the cube) in the column's own order
+        return grouped_records(grouped)
+
+    # Stable, so ties keep group order whether grouped here or read off the cube
+    grouped = grouped.sort_values(ascending=spec["sort"] == "asc", kind="stable")
+
+    if spec["top_n"]:
+        grouped = grouped.head(spec["top_n"])
+
+    return grouped_records(grouped)
+
+
+def execute_chart(df: pd.DataFrame, spec: dict) -> list[dict]:
+    """Chart records for a normalized spec; df must hold the spec's columns."""
+    if spec["type"] == "histogram":
+        return _histogram(sorted_values(df[spec["x"]]), spec)
+    if spec["type"] == "scatter":
+        return _scatter(df, spec)
+    return _aggregated(df, spec)
+
+
+class ChartResultCache:
+    """LRU of chart data keyed by (dataset_id, spec hash).
+
+    Cached lists are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], list[dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, str]) -> list[dict] | None:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: tuple[str, str], data: list[dict]):
+        if len(data) > CHART_CACHE_MAX_RECORDS:
+            return
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, dataset_id: str):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == dataset_id]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+chart_result_cache = ChartResultCache(CHART_CACHE_MAX_ENTRIES)
+register_derived_cache(chart_result_cache)
+
+
+def run_chart(dataset_id: str, spec: dict) -> list[dict] | None:
+    """Normalize, execute and memoize a chart spec against a stored dataset.
+
+    Returns None when the dataset does not exist and raises ChartSpecError
+    when the spec does not fit it.
+    """
+    spec = normalize_spec(spec)
+    key = (dataset_id, spec_hash(spec))
+
+    if not dataset_exists(dataset_id):
+        # It may have been deleted by another worker, whose caches were cleared
+        # but not this one's
+        forget_dataset(dataset_id)
+        return None
+
+    data = chart_result_cache.get(key)
+    if data is not None:
+        return data
+
+    columns = get_dataset_columns(dataset_id)
+    if columns is None:
+        return None
+
+    needed = [spec["x"]] + ([spec["y"]] if spec.get("y") and spec["y"] != spec["x"] else [])
+    for col in needed + filter_columns(spec["filters"]):
+        if col not in columns:
+            raise ChartSpecError(f"Column '{col}' not found.")
+
+    grouped = None
+    if spec["type"] in ("bar", "pie", "line") and not spec["filters"]:
+        # Group-bys over a low-cardinality column are read off the cube
+        grouped = cube_series(load_cube(dataset_id), spec["x"], spec["y"], spec["aggregation"])
+
+    if grouped is not None:
+        data = _ranked(grouped, spec)
+    elif spec["type"] == "histogram" and not spec["filters"]:
+        # Rebinning reuses the column's cached sorted values
+        values = sorted_column(dataset_id, spec["x"])
+        if values is None:
+            return None
+        data = _histogram(values, spec)
+    else:
+        df = load_dataset(dataset_id, columns=needed + filter_columns(spec["filters"]))
+        if df is None:
+            return None
+        if spec["filters"]:
+            try:
+                # Batches the zone map rules out are never evaluated
+                rows = matching_rows(df, spec["filters"], load_zone_map(dataset_id))
+            except FilterError as e:
+                raise ChartSpecError(str(e))
+            df = df.iloc[rows]
+        data = execute_chart(df, spec)
+
+    chart_result_cache.put(key, data)
+    return data
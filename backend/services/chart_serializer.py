@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+from fastapi.responses import ORJSONResponse
+
+# Chart payloads are built column-wise: each column is converted to a Python
+# list once with NumPy, and the records are zipped together from those lists.
+# This avoids the per-row Series that DataFrame.iterrows() allocates.
+
+
+def _floats(values, digits: int | None) -> list:
+    values = np.asarray(values, dtype="float64")
+    if digits is not None:
+        values = np.round(values, digits)
+
+    out = values.tolist()
+    # NaN/inf have no JSON representation; report them as null
+    finite = np.isfinite(values)
+    if not finite.all():
+        for i in np.flatnonzero(~finite):
+            out[i] = None
+    return out
+
+
+def _labels(labels) -> list[str]:
+    if pd.api.types.is_datetime64_any_dtype(labels):
+        # Formats every timestamp at once, dropping the time part when all are midnight
+        labels = pd.Index(labels).astype(str)
+    values = labels.tolist() if hasattr(labels, "tolist") else list(labels)
+    return list(map(str, values))
+
+
+def label_value_records(
+    labels, values, digits: int | None = 2, label_key: str = "label", value_key: str = "value"
+) -> list[dict]:
+    """[{"label": str, "value": float}] for bar, line and pie charts."""
+    return [
+        {label_key: label, value_key: value}
+        for label, value in zip(_labels(labels), _floats(values, digits))
+    ]
+
+
+def grouped_records(grouped: pd.Series, digits: int | None = 2, **keys) -> list[dict]:
+    """Chart records from a group-by result indexed by the label column."""
+    return label_value_records(grouped.index, grouped.to_numpy(), digits, **keys)
+
+
+def point_records(x, y) -> list[dict]:
+    """[{"x": float, "y": float}] for scatter charts."""
+    return [{"x": a, "y": b} for a, b in zip(_floats(x, None), _floats(y, None))]
+
+
+def histogram_records(counts, edges, digits: int = 2) -> list[dict]:
+    """One {"label": "lo-hi", "value": count} record per histogram bin."""
+    bounds = np.round(np.asarray(edges, dtype="float64"), digits).tolist()
+    return [
+        {"label": f"{lo}-{hi}", "value": count}
+        for lo, hi, count in zip(bounds[:-1], bounds[1:], np.asarray(counts).tolist())
+    ]
+
+
+def chart_response(content: dict) -> ORJSONResponse:
+    # Returning the response directly skips FastAPI's jsonable_encoder pass,
+    # which walks every record in Python before the JSON is even written
+    return ORJSONResponse(content)
@@ -0,0 +1,239 @@
+import numpy as np
+import pandas as pd
+
+# Pairwise statistics are computed one pair of column blocks at a time and
+# accumulated over slices of rows, so besides the blocks' values the
+# working memory is O(block**2) however wide the dataset is
+CORRELATION_BLOCK_COLUMNS = 64
+CORRELATION_ROW_CHUNK = 100_000
+MIN_PERIODS = 3
+# Prepared (converted, ranked) blocks are kept for reuse across block pairs
+# while they fit in this many bytes, and rebuilt on demand beyond it
+CORRELATION_REUSE_BYTES = 256 * 1024 * 1024
+# Categorical columns with more levels than this are not associated
+MAX_CATEGORIES = 50
+
+
+def _numeric_block(df: pd.DataFrame, columns: list, method: str) -> np.ndarray:
+    block = df[columns]
+    if method == "spearman":
+        # Ranks over each column's non-null values; with missing data this is
+        # close to, but not exactly, pandas' pairwise-complete Spearman
+        block = block.rank()
+    values = block.to_numpy(dtype="float64", na_value=np.nan)
+    # Centering first keeps the sums of squares below from cancelling badly
+    return values - np.nanmean(values, axis=0) if len(values) else values
+
+
+class _PairSums:
+    """Pairwise-complete sums between two column blocks, accumulated by row slice."""
+
+    def __init__(self, a: int, b: int):
+        shape = (a, b)
+        self.n = np.zeros(shape)
+        self.sx = np.zeros(shape)
+        self.sy = np.zeros(shape)
+        self.sxx = np.zeros(shape)
+        self.syy = np.zeros(shape)
+        self.sxy = np.zeros(shape)
+
+    def add(self, x: np.ndarray, y: np.ndarray):
+        mx, my = ~np.isnan(x), ~np.isnan(y)
+        x, y = np.where(mx, x, 0.0), np.where(my, y, 0.0)
+        mx, my = mx.astype("float64"), my.astype("float64")
+        self.n += mx.T @ my
+        self.sx += x.T @ my
+        self.sy += mx.T @ y
+        self.sxx += (x * x).T @ my
+        self.syy += mx.T @ (y * y)
+        self.sxy += x.T @ y
+
+    def pearson(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = self.sxy - self.sx * self.sy / self.n
+            var_x = self.sxx - self.sx ** 2 / self.n
+            var_y = self.syy - self.sy ** 2 / self.n
+            r = cov / np.sqrt(var_x * var_y)
+        r[(self.n < MIN_PERIODS) | ~np.isfinite(r)] = np.nan
+        return np.clip(r, -1.0, 1.0)
+
+
+def _block_correlation(x_block: np.ndarray, y_block: np.ndarray) -> np.ndarray:
+    if not np.isnan(x_block).any() and not np.isnan(y_block).any():
+        # Complete blocks: one matrix product of unit-length centered columns
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_unit = x_block / np.linalg.norm(x_block, axis=0)
+            y_unit = y_block / np.linalg.norm(y_block, axis=0)
+            r = x_unit.T @ y_unit
+        r[~np.isfinite(r)] = np.nan
+        if len(x_block) < MIN_PERIODS:
+            r[:] = np.nan
+        return np.clip(r, -1.0, 1.0)
+
+    sums = _PairSums(x_block.shape[1], y_block.shape[1])
+    for start in range(0, len(x_block), CORRELATION_ROW_CHUNK):
+        stop = start + CORRELATION_ROW_CHUNK
+        sums.add(x_block[start:stop], y_block[start:stop])
+    return sums.pearson()
+
+
+class _TopPairs:
+    """Running top-k of (|value|, i, j) candidates across blocks."""
+
+    def __init__(self, k: int, threshold: float):
+        self.k = k
+        self.threshold = threshold
+        self.values = np.empty(0)
+        self.left = np.empty(0, dtype=np.int64)
+        self.right = np.empty(0, dtype=np.int64)
+
+    def add(self, values: np.ndarray, left: np.ndarray, right: np.ndarray):
+        keep = np.abs(np.nan_to_num(values)) >= self.threshold
+        self.values = np.concatenate([self.values, values[keep]])
+        self.left = np.concatenate([self.left, left[keep]])
+        self.right = np.concatenate([self.right, right[keep]])
+
+        if len(self.values) > self.k:
+            top = np.argpartition(-np.abs(self.values), self.k - 1)[:self.k]
+            self.values, self.left, self.right = self.values[top], self.left[top], self.right[top]
+
+    def sorted(self) -> list[tuple[float, int, int]]:
+        order = np.lexsort((self.right, self.left, -np.abs(self.values)))
+        return [(float(self.values[i]), int(self.left[i]), int(self.right[i])) for i in order]
+
+
+def top_correlations(
+    df: pd.DataFrame,
+    columns: list,
+    method: str = "pearson",
+    top_k: int = 3,
+    threshold: float = 0.0,
+) -> list[dict]:
+    """Strongest pairwise Pearson or Spearman correlations among `columns`.
+
+    Only the upper triangle is examined, one block pair at a time, and only
+    pairs with |r| >= threshold compete for the top_k places.
+    """
+    top = _TopPairs(top_k, threshold)
+    starts = range(0, len(columns), CORRELATION_BLOCK_COLUMNS)
+    reuse = len(df) * len(columns) * 8 <= CORRELATION_REUSE_BYTES
+    prepared = {}
+
+    def block(start: int) -> np.ndarray:
+        if start in prepared:
+            return prepared[start]
+        values = _numeric_block(df, columns[start:start + CORRELATION_BLOCK_COLUMNS], method)
+        if reuse:
+            prepared[start] = values
+        return values
+
+    for x_start in starts:
+        x_block = block(x_start)
+
+        for y_start in starts:
+            if y_start < x_start:
+                continue
+            y_block = x_block if y_start == x_start else block(y_start)
+            r = _block_correlation(x_block, y_block)
+
+            rows, cols = np.indices(r.shape)
+            mask = rows < cols if y_start == x_start else np.ones(r.shape, dtype=bool)
+            top.add(r[mask], rows[mask] + x_start, cols[mask] + y_start)
+
+    return [
+        {"x": columns[i], "y": columns[j], "method": method, "value": value}
+        for value, i, j in top.sorted()
+    ]
+
+
+def _codes(series: pd.Series) -> tuple[np.ndarray, int]:
+    codes, levels = pd.factorize(series, sort=False)
+    return codes, len(levels)
+
+
+def cramers_v(a: pd.Series, b: pd.Series) -> float | None:
+    """Cramér's V between two categorical columns (0 = independent, 1 = determined)."""
+    codes_a, ka = _codes(a)
+    codes_b, kb = _codes(b)
+    valid = (codes_a >= 0) & (codes_b >= 0)
+    n = int(valid.sum())
+    if n < MIN_PERIODS or min(ka, kb) < 2:
+        return None
+
+    observed = np.bincount(codes_a[valid] * kb + codes_b[valid], minlength=ka * kb).reshape(ka, kb)
+    rows, cols = observed.sum(axis=1), observed.sum(axis=0)
+    # Levels that only occur next to nulls in the other column drop out
+    observed = observed[rows > 0][:, cols > 0]
+    rows, cols = rows[rows > 0], cols[cols > 0]
+    if min(len(rows), len(cols)) < 2:
+        return None
+
+    expected = np.outer(rows, cols) / n
+    chi2 = float(((observed - expected) ** 2 / expected).sum())
+    return float(np.sqrt(chi2 / n / (min(len(rows), len(cols)) - 1)))
+
+
+def correlation_ratios(categories: pd.Series, df: pd.DataFrame, columns: list) -> np.ndarray:
+    """Correlation ratio (eta) of each numeric column against one categorical column."""
+    codes, k = _codes(categories)
+    eta = np.full(len(columns), np.nan)
+    if k < 2:
+        return eta
+
+    for start in range(0, len(columns), CORRELATION_BLOCK_COLUMNS):
+        block = columns[start:start + CORRELATION_BLOCK_COLUMNS]
+        block_values = _numeric_block(df, block, "pearson")
+        counts = np.zeros((k, len(block)))
+        sums = np.zeros((k, len(block)))
+        squares = np.zeros(len(block))
+
+        for row in range(0, len(df), CORRELATION_ROW_CHUNK):
+            chunk_codes = codes[row:row + CORRELATION_ROW_CHUNK]
+            values = block_values[row:row + CORRELATION_ROW_CHUNK].copy()
+            values[chunk_codes < 0] = np.nan
+
+            valid = ~np.isnan(values)
+            values = np.where(valid, values, 0.0)
+            one_hot = np.zeros((len(chunk_codes), k))
+            one_hot[chunk_codes >= 0, chunk_codes[chunk_codes >= 0]] = 1.0
+
+            counts += one_hot.T @ valid
+            sums += one_hot.T @ values
+            squares += (values * values).sum(axis=0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            n = counts.sum(axis=0)
+            total = sums.sum(axis=0)
+            between = np.nansum(np.where(counts > 0, sums ** 2 / counts, 0.0), axis=0) - total ** 2 / n
+            within = squares - total ** 2 / n
+            ratio = np.sqrt(np.clip(between / within, 0.0, 1.0))
+        ratio[(n < MIN_PERIODS) | ~np.isfinite(ratio)] = np.nan
+        eta[start:start + len(block)] = ratio
+
+    return eta
+
+
+def top_associations(
+    df: pd.DataFrame,
+    categorical: list,
+    numeric: list,
+    top_k: int = 3,
+    threshold: float = 0.0,
+) -> list[dict]:
+    """Strongest Cramér's V (categorical pairs) and correlation ratios
+    (categorical vs numeric) among the given columns."""
+    results = []
+
+    for i, a in enumerate(categorical):
+        for b in categorical[i + 1:]:
+            value = cramers_v(df[a], df[b])
+            if value is not None and value >= threshold:
+                results.append({"x": a, "y": b, "method": "cramers_v", "value": value})
+
+        if numeric:
+            eta = correlation_ratios(df[a], df, numeric)
+            for j in np.flatnonzero(np.nan_to_num(eta) >= threshold):
+                results.append({"x": a, "y": numeric[j], "method": "correlation_ratio", "value": float(eta[j])})
+
+    results.sort(key=lambda r: -r["value"])
+    return results[:top_k]
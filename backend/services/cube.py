@@ -0,0 +1,164 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# The cube holds, for every low-cardinality dimension (a categorical or
+# boolean column), the sum, count, min and max of every numeric column per
+# dimension value. It is built once after upload; a bar or pie chart over a
+# dimension is then a lookup, with mean derived as sum / count. Wide frames
+# get a partial cube: at most CUBE_MAX_MEASURES measures, and dimensions only
+# while the total stays within CUBE_MAX_CELLS values. Anything left out is
+# grouped on demand by the chart engine instead.
+
+CUBE_MAX_CATEGORIES = int(os.getenv("CUBE_MAX_CATEGORIES", 100))
+CUBE_MAX_MEASURES = int(os.getenv("CUBE_MAX_MEASURES", 32))
+CUBE_MAX_CELLS = int(os.getenv("CUBE_MAX_CELLS", 250_000))
+CUBE_STATS = ("sum", "count", "min", "max")
+CUBE_CACHE_BYTES = int(os.getenv("CUBE_CACHE_BYTES", 64 * 1024 * 1024))
+
+
+def cube_dimensions(df: pd.DataFrame) -> list[str]:
+    return [
+        col for col, dtype in df.dtypes.items()
+        if pd.api.types.is_bool_dtype(dtype)
+        or (isinstance(dtype, pd.CategoricalDtype) and len(dtype.categories) <= CUBE_MAX_CATEGORIES)
+    ]
+
+
+def cube_measures(df: pd.DataFrame) -> list[str]:
+    return [
+        col for col, dtype in df.dtypes.items()
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+    ]
+
+
+def _values(series: pd.Series) -> list:
+    values = series.to_numpy(dtype="float64", na_value=np.nan)
+    # Groups with no values have no min/max; null keeps the JSON valid
+    return [None if np.isnan(v) else v for v in values.tolist()]
+
+
+def build_cube(df: pd.DataFrame) -> dict:
+    """{"dimensions": {dim: {"labels": [...], "measures": {col: {stat: [...]}}}}}.
+
+    Groups match the chart engine's group-by (missing values form a group,
+    unobserved categories don't) and labels are formatted as chart labels.
+    """
+    measures = cube_measures(df)[:CUBE_MAX_MEASURES]
+    # Aggregate float32 columns in float64, like the chart engine does
+    frame = df[measures].astype({col: "float64" for col in measures if df[col].dtype == np.float32})
+    dimensions = {}
+    cells = 0
+
+    for dim in cube_dimensions(df):
+        # Upper bound on the groups: every category (or both booleans) plus missing
+        dtype = df[dim].dtype
+        groups = (len(dtype.categories) if isinstance(dtype, pd.CategoricalDtype) else 2) + 1
+        size = groups * len(measures) * len(CUBE_STATS)
+        if cells + size > CUBE_MAX_CELLS:
+            continue
+        cells += size
+
+        grouped = frame.groupby(df[dim], dropna=False, observed=True)
+        stats = {stat: getattr(grouped, stat)() for stat in CUBE_STATS}
+
+        dimensions[dim] = {
+            "labels": list(map(str, stats["sum"].index.tolist())),
+            "measures": {
+                col: {stat: _values(stats[stat][col]) for stat in CUBE_STATS}
+                for col in measures
+            },
+        }
+
+    return {"dimensions": dimensions}
+
+
+def cube_series(cube: dict | None, x: str, y: str, aggregation: str) -> pd.Series | None:
+    """y aggregated per value of x, indexed by label, or None if the cube
+    doesn't cover that pair."""
+    if cube is None:
+        return None
+    dimension = cube["dimensions"].get(x)
+    if dimension is None or y not in dimension["measures"]:
+        return None
+
+    measure = dimension["measures"][y]
+    if aggregation == "mean":
+        sums = np.array(measure["sum"], dtype="float64")
+        counts = np.array(measure["count"], dtype="float64")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(counts > 0, sums / counts, np.nan)
+    else:
+        values = np.array(measure[aggregation], dtype="float64")
+
+    return pd.Series(values, index=pd.Index(dimension["labels"], dtype=object))
+
+
+def cube_nbytes(cube: dict) -> int:
+    """Approximate in-memory size of a parsed cube."""
+    size = 0
+    for dimension in cube["dimensions"].values():
+        # A list slot plus a float object per value, a str object per label
+        size += len(dimension["labels"]) * len(dimension["measures"]) * len(CUBE_STATS) * 32
+        size += sum(49 + len(label) for label in dimension["labels"])
+    return size
+
+
+class CubeCache:
+    """LRU of parsed cubes keyed by dataset_id, bounded in bytes, so chart
+    requests don't re-read the JSON sidecar.
+
+    Cached cubes are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[dict, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, dataset_id: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(dataset_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, dataset_id: str, cube: dict):
+        size = cube_nbytes(cube)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if dataset_id in self._entries:
+                self.nbytes -= self._entries.pop(dataset_id)[1]
+            self._entries[dataset_id] = (cube, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                self.nbytes -= self._entries.popitem(last=False)[1][1]
+
+    def invalidate(self, dataset_id: str):
+        with self._lock:
+            entry = self._entries.pop(dataset_id, None)
+            if entry is not None:
+                self.nbytes -= entry[1]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+cube_cache = CubeCache(CUBE_CACHE_BYTES)
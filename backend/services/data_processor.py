@@ -1,93 +1,648 @@
 import pandas as pd
-import io
+import numpy as np
+import codecs
 import os
 import pickle
+import json
 import logging
+import tempfile
+import threading
+import time
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+from pandas.tseries.api import guess_datetime_format
+from services.dataset_cache import dataset_cache
+from services.profiler import profile_columns
+from services.cube import build_cube, cube_cache
+
+# Frames handed out by load_dataset share their columns with the dataset
+# cache and with concurrent requests. Under copy-on-write, a route that
+# coerces or assigns a column gets a private copy of that column only, and
+# the shared frame is never modified. pandas >= 3 always works this way and
+# deprecates the option.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.options.mode.copy_on_write = True
 
 # Setup basic logging to catch errors in the background
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 STORAGE_DIR = "./data"
+
+# Bump whenever get_dataset_info changes shape so stored profiles get rebuilt
+PROFILE_VERSION = 4
+# Likewise for build_cube and stored cubes
+CUBE_VERSION = 2
 os.makedirs(STORAGE_DIR, exist_ok=True)
 
-def parse_csv(contents: bytes) -> pd.DataFrame:
+# Upload bodies are copied to disk and parsed in fixed-size pieces so peak
+# memory depends on these settings rather than on the size of the file
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", 1024 * 1024))
+CSV_CHUNK_ROWS = int(os.getenv("CSV_CHUNK_ROWS", 100_000))
+ENCODING_SAMPLE_BYTES = 64 * 1024
+
+# Text columns with at most this many distinct values (and fewer distinct
+# values than CATEGORY_MAX_RATIO of their rows) are stored dictionary-encoded
+# and load as pandas categoricals
+CATEGORY_MAX_UNIQUE = int(os.getenv("CATEGORY_MAX_UNIQUE", 1000))
+CATEGORY_MAX_RATIO = 0.5
+
+_INT_TYPES = [np.int8, np.int16, np.int32, np.int64]
+FLOAT32_EXACT_INT = 2 ** 24
+
+# In-memory caches of anything derived from a dataset; each module that keeps
+# one registers it, and all of them are invalidated together
+_derived_caches = [dataset_cache, cube_cache]
+
+def detect_encoding(path: str) -> str:
+    with open(path, "rb") as f:
+        sample = f.read(ENCODING_SAMPLE_BYTES)
+
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+
     try:
-        return pd.read_csv(io.BytesIO(contents), low_memory=False)
-    except:
-        return pd.read_csv(io.BytesIO(contents), encoding="latin1")
+        # final=False tolerates a multi-byte character cut off at the end of the sample
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin1"
+
+def _column_kind(series: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(series):
+        return "bool"
+    if pd.api.types.is_integer_dtype(series):
+        return "int"
+    if pd.api.types.is_float_dtype(series):
+        return "float"
+    return "str"
+
+def _merge_kind(current: str | None, new: str) -> str:
+    if current is None or current == new:
+        return new
+    if {current, new} == {"int", "float"}:
+        return "float"
+    return "str"
+
+def _datetime_format(values: pd.Series) -> str | None:
+    """strftime format every non-null value parses with, if there is one."""
+    if values.empty:
+        return None
+    fmt = guess_datetime_format(str(values.iloc[0]))
+    if fmt is None:
+        return None
+    parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+    if isinstance(parsed.dtype, pd.DatetimeTZDtype) or parsed.isna().any():
+        return None
+    return fmt
+
+class _ColumnScan:
+    """What the first ingest pass learns about one column across all chunks."""
+
+    def __init__(self):
+        self.kind = None
+        self.rows = 0
+        self.min = None
+        self.max = None
+        self.float32 = True
+        # Distinct text values while there are few enough to dictionary-encode
+        self.categories = set()
+        self._category_values = None
+        self.datetime_format = None
+        self.datetime_checked = False
+        # Whether any chunk had values pandas parsed as numbers or booleans
+        self.parsed_values = False
+
+    def add(self, values: pd.Series):
+        previous = self.kind
+        chunk_kind = _column_kind(values)
+        self.kind = _merge_kind(self.kind, chunk_kind)
+        self.rows += len(values)
+
+        if chunk_kind != "str" and values.notna().any():
+            self.parsed_values = True
+
+        if self.kind == "str" and self.parsed_values and self.categories is not None:
+            # Some chunk, before or after the text ones, was parsed as numbers
+            # or booleans, so its original text ("1.50", "true") was never
+            # seen; keep the column as plain strings
+            self.categories = None
+            self.datetime_format = None
+            self.datetime_checked = True
+
+        if previous == "int" and self.kind == "float" and self.min is not None:
+            # The integers already seen never went through the float32 round
+            # trip; float32 holds every integer only up to 2**24
+            if max(-self.min, self.max) > FLOAT32_EXACT_INT:
+                self.float32 = False
+
+        if self.kind == "int" and len(values):
+            # Exact Python ints: near the int64/uint64 limits a float bound
+            # would round onto the wrong side of a type's range
+            low, high = int(values.min()), int(values.max())
+            self.min = low if self.min is None else min(self.min, low)
+            self.max = high if self.max is None else max(self.max, high)
+
+        if self.kind == "float" and len(values):
+            array = values.to_numpy(dtype="float64")
+            if not np.isnan(array).all():
+                low, high = np.nanmin(array), np.nanmax(array)
+                self.min = low if self.min is None else min(self.min, low)
+                self.max = high if self.max is None else max(self.max, high)
+            if self.float32:
+                self.float32 = np.array_equal(
+                    array.astype(np.float32).astype(np.float64), array, equal_nan=True
+                )
+
+        if self.kind == "str":
+            text = values.dropna().astype(str)
+            if not self.datetime_checked:
+                self.datetime_format = _datetime_format(text)
+                self.datetime_checked = True
+            elif self.datetime_format is not None:
+                parsed = pd.to_datetime(text, format=self.datetime_format, errors="coerce")
+                if parsed.isna().any():
+                    self.datetime_format = None
+            if self.categories is not None:
+                self.categories.update(text.unique())
+                if len(self.categories) > CATEGORY_MAX_UNIQUE:
+                    self.categories = None
+
+    def category_values(self) -> list[str]:
+        if self._category_values is None:
+            self._category_values = sorted(self.categories)
+        return self._category_values
+
+    def logical_type(self) -> str:
+        if self.kind != "str":
+            return self.kind
+        if self.datetime_format is not None:
+            return "datetime"
+        if self.categories is not None and len(self.categories) <= self.rows * CATEGORY_MAX_RATIO:
+            return "category"
+        return "str"
+
+    def arrow_type(self) -> pa.DataType:
+        logical = self.logical_type()
+        if logical == "int":
+            for int_type in _INT_TYPES:
+                info = np.iinfo(int_type)
+                if self.min is None or (info.min <= self.min and self.max <= info.max):
+                    return pa.from_numpy_dtype(int_type)
+            # Beyond int64 (pandas parsed the column as uint64, or chunks
+            # disagreed): unsigned if nothing is negative, else approximate
+            if self.min >= 0 and self.max <= np.iinfo(np.uint64).max:
+                return pa.uint64()
+            return pa.float64()
+        if logical == "float":
+            return pa.float32() if self.float32 else pa.float64()
+        if logical == "category":
+            return pa.dictionary(pa.int32(), pa.string())
+        if logical == "datetime":
+            return pa.timestamp("ns")
+        return {"bool": pa.bool_(), "str": pa.string()}[logical]
+
+    def read_dtype(self) -> str:
+        if self.kind == "bool":
+            return "bool"
+        if self.kind in ("int", "float"):
+            return self.arrow_type().to_pandas_dtype().__name__
+        return "object"
+
+def _read_csv_chunks(path: str, encoding: str, dtype: dict | None = None):
+    # Bytes that aren't valid in the sniffed encoding are replaced rather than
+    # triggering a second full parse
+    return pd.read_csv(
+        path,
+        chunksize=CSV_CHUNK_ROWS,
+        encoding=encoding,
+        encoding_errors="replace",
+        dtype=dtype,
+    )
+
+def _chunk_to_batch(chunk: pd.DataFrame, schema: pa.Schema, scans: dict) -> pa.RecordBatch:
+    arrays = []
+    for field in schema:
+        values = chunk[field.name]
+        if pa.types.is_dictionary(field.type):
+            # Every batch shares the dictionary gathered in the first pass
+            categories = scans[field.name].category_values()
+            codes = pd.Categorical(values, categories=categories).codes.astype(np.int32)
+            arrays.append(pa.DictionaryArray.from_arrays(
+                pa.array(codes, mask=codes < 0), pa.array(categories, type=pa.string())
+            ))
+        elif pa.types.is_timestamp(field.type):
+            parsed = pd.to_datetime(values, format=scans[field.name].datetime_format, errors="coerce")
+            arrays.append(pa.array(parsed, type=field.type, from_pandas=True))
+        elif pa.types.is_string(field.type):
+            arrays.append(pa.array(values, type=field.type, from_pandas=True))
+        else:
+            # NaN stays a float value, matching _to_arrow
+            arrays.append(pa.array(values.to_numpy(), type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def ingest_csv(dataset_id: str, csv_path: str):
+    """Parse a CSV on disk into dataset storage without holding it in memory.
+
+    The first pass settles each column's type across all chunks (the same
+    int -> float -> string widening a single read_csv would do) and picks
+    its compact storage: the narrowest integer width that holds its range,
+    float32 when every value survives the round trip, dictionary encoding
+    for low-cardinality text and timestamps for text that parses as dates
+    with one format. The second pass parses with those types fixed and
+    appends one record batch per chunk to the Arrow file, whose schema is
+    what every later load uses.
+    """
+    encoding = detect_encoding(csv_path)
+
+    scans: dict[str, _ColumnScan] = {}
+    for chunk in _read_csv_chunks(csv_path, encoding):
+        for col in chunk.columns:
+            scans.setdefault(col, _ColumnScan()).add(chunk[col])
+
+    if not scans:
+        raise ValueError("CSV file has no columns.")
+
+    schema = pa.schema([(col, scan.arrow_type()) for col, scan in scans.items()])
+    dtype = {col: scan.read_dtype() for col, scan in scans.items()}
+
+    path = _dataset_path(dataset_id)
+    tmp_path = f"{path}.tmp"
+    zones = []
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            for chunk in _read_csv_chunks(csv_path, encoding, dtype):
+                batch = _chunk_to_batch(chunk, schema, scans)
+                writer.write_batch(batch)
+                zones.append(_batch_zones(batch))
+        os.replace(tmp_path, path)
+        _write_json(_zone_map_path(dataset_id), {"batches": zones})
+    except Exception as e:
+        logger.error(f"Failed to ingest dataset {dataset_id}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise e
+
+    dataset_cache.invalidate(dataset_id)
+    logger.info(f"Dataset {dataset_id} ingested from {encoding} CSV.")
+
+def _dataset_path(dataset_id: str) -> str:
+    return os.path.join(STORAGE_DIR, f"{dataset_id}.arrow")
+
+def _legacy_path(dataset_id: str) -> str:
+    return os.path.join(STORAGE_DIR, f"{dataset_id}.pkl")
+
+def _profile_path(dataset_id: str) -> str:
+    return os.path.join(STORAGE_DIR, f"{dataset_id}.profile.json")
+
+def _status_path(dataset_id: str) -> str:
+    return os.path.join(STORAGE_DIR, f"{dataset_id}.status.json")
+
+def _cube_path(dataset_id: str) -> str:
+    return os.path.join(STORAGE_DIR, f"{dataset_id}.cube.json")
+
+def _zone_map_path(dataset_id: str) -> str:
+    return os.path.join(STORAGE_DIR, f"{dataset_id}.zones.json")
+
+def _write_json(path: str, data: dict):
+    # Each writer gets its own temp file, so concurrent writers of the same
+    # sidecar each rename a complete file into place
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# Sidecars rebuilt on first access are rebuilt once: concurrent requests for
+# the same one wait for the first rebuild instead of repeating it
+_rebuild_locks: dict[str, threading.Lock] = {}
+_rebuild_locks_guard = threading.Lock()
+
+def _rebuild_lock(path: str) -> threading.Lock:
+    with _rebuild_locks_guard:
+        return _rebuild_locks.setdefault(path, threading.Lock())
+
+def _to_arrow(df: pd.DataFrame) -> pa.Table:
+    df = df.reset_index(drop=True)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Object columns mixing strings and numbers can't be typed by Arrow; store them as text
+        for col in df.columns:
+            if df[col].dtype == object:
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+    # Keep NaN as a float value rather than an Arrow null: a column without a
+    # validity bitmap converts back to pandas without copying
+    for i, field in enumerate(table.schema):
+        if pa.types.is_floating(field.type) and table.column(i).null_count:
+            table = table.set_column(i, field, pa.array(df.iloc[:, i].to_numpy(), type=field.type))
+
+    return table
+
+def _mapped_nbytes(df: pd.DataFrame) -> int:
+    """Bytes of columns that are read-only views over the memory-mapped file."""
+    total = 0
+    for _, series in df.items():
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            data = series.cat.codes.to_numpy()
+        elif isinstance(series.dtype, np.dtype):
+            data = series.to_numpy()
+        else:
+            continue
+        if not data.flags.writeable and not data.flags.owndata:
+            total += data.nbytes
+    return total
+
+def _batch_zones(batch: pa.RecordBatch) -> dict:
+    """Row count, and each column's missing-value count and min/max, of one
+    record batch. Timestamps are recorded as integer nanoseconds; plain text
+    columns get no min/max, which would be as long as their longest value."""
+    columns = {}
+    for field, array in zip(batch.schema, batch.columns):
+        zone = {"nulls": array.null_count}
+        if pa.types.is_dictionary(field.type):
+            array = array.dictionary_decode()
+        elif pa.types.is_timestamp(field.type):
+            array = array.cast(pa.timestamp("ns", tz=field.type.tz)).cast(pa.int64())
+        elif pa.types.is_floating(field.type):
+            # NaN stands in for null in float columns
+            zone["nulls"] += pc.sum(pc.is_nan(array)).as_py() or 0
+        elif not (pa.types.is_integer(field.type) or pa.types.is_boolean(field.type)):
+            columns[field.name] = zone
+            continue
+
+        bounds = pc.min_max(array).as_py()
+        # All-missing batches have no bounds (min_max reports None, or NaN for floats)
+        if bounds["min"] is not None and bounds["min"] == bounds["min"]:
+            zone["min"], zone["max"] = bounds["min"], bounds["max"]
+        columns[field.name] = zone
+    return {"rows": batch.num_rows, "columns": columns}
+
+def load_zone_map(dataset_id: str) -> list[dict] | None:
+    """Per-batch zones of a dataset in row order, or None if it has none."""
+    path = _zone_map_path(dataset_id)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)["batches"]
 
 def save_dataset(dataset_id: str, df: pd.DataFrame):
-    path = os.path.join(STORAGE_DIR, f"{dataset_id}.pkl")
+    path = _dataset_path(dataset_id)
     try:
-        with open(path, "wb") as f:
-            pickle.dump(df, f)
+        # Write uncompressed so readers can map the file; rename into place
+        # atomically because other workers may still have the old file mapped
+        fd, tmp_path = tempfile.mkstemp(dir=STORAGE_DIR, suffix=".tmp")
+        os.close(fd)
+        table = _to_arrow(df)
+        try:
+            feather.write_feather(table, tmp_path, compression="uncompressed")
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        # Zones cover the same row ranges an ingest of the data would write
+        zones = [_batch_zones(batch) for batch in table.to_batches(max_chunksize=CSV_CHUNK_ROWS)]
+        _write_json(_zone_map_path(dataset_id), {"batches": zones})
+        dataset_cache.invalidate(dataset_id)
         logger.info(f"Dataset {dataset_id} saved successfully.")
     except Exception as e:
         logger.error(f"Failed to save dataset {dataset_id}: {e}")
         raise e
 
-def load_dataset(dataset_id: str) -> pd.DataFrame | None:
-    path = os.path.join(STORAGE_DIR, f"{dataset_id}.pkl")
-    if not os.path.exists(path):
-        logger.warning(f"Dataset file {path} not found.")
+    write_profile(dataset_id, df)
+    write_cube(dataset_id, df)
+
+def _resolve_path(dataset_id: str) -> str | None:
+    path = _dataset_path(dataset_id)
+    if os.path.exists(path):
+        return path
+
+    # Datasets pickled before the columnar format are converted on first access
+    legacy = _legacy_path(dataset_id)
+    with _rebuild_lock(legacy):
+        if os.path.exists(path):
+            return path
+        if os.path.exists(legacy):
+            with open(legacy, "rb") as f:
+                save_dataset(dataset_id, pickle.load(f))
+            os.remove(legacy)
+            return path
+
+    logger.warning(f"Dataset file {path} not found.")
+    return None
+
+def _read_schema(dataset_id: str) -> pa.Schema | None:
+    path = _resolve_path(dataset_id)
+    if path is None:
+        return None
+    with pa.ipc.open_file(path) as reader:
+        return reader.schema
+
+def read_arrow_table(dataset_id: str) -> pa.Table | None:
+    """The stored dataset as an Arrow table over the memory-mapped file, uncopied."""
+    path = _resolve_path(dataset_id)
+    if path is None:
+        return None
+    return feather.read_table(path, memory_map=True)
+
+def get_dataset_columns(dataset_id: str) -> list[str] | None:
+    """Column names of a stored dataset, read from the file footer only."""
+    schema = _read_schema(dataset_id)
+    return schema.names if schema is not None else None
+
+def get_numeric_columns(dataset_id: str, include_bool: bool = False) -> list[str] | None:
+    """Integer and float columns of every width, plus booleans if asked."""
+    schema = _read_schema(dataset_id)
+    if schema is None:
         return None
+    return [
+        field.name for field in schema
+        if pa.types.is_integer(field.type)
+        or pa.types.is_floating(field.type)
+        or (include_bool and pa.types.is_boolean(field.type))
+    ]
+
+def load_dataset(dataset_id: str, columns: list[str] | None = None) -> pd.DataFrame | None:
+    """Load a dataset, reading only `columns` from disk when given.
+
+    Columns not present in the dataset are ignored, so callers should
+    validate names against get_dataset_columns first.
+    """
+    try:
+        all_columns = get_dataset_columns(dataset_id)
+    except Exception as e:
+        logger.error(f"Error reading dataset {dataset_id}: {e}")
+        return None
+
+    if all_columns is None:
+        return None
+
+    wanted = all_columns if columns is None else [c for c in dict.fromkeys(columns) if c in all_columns]
+
+    cached = dataset_cache.get(dataset_id, wanted)
+    if cached is not None:
+        # A new frame object per caller; its column data stays shared until written
+        return cached.copy(deep=False)
+
+    resident = dataset_cache.peek(dataset_id)
+    missing = wanted if resident is None else [c for c in wanted if c not in resident.columns]
+
     try:
-        with open(path, "rb") as f:
-            return pickle.load(f)
+        # Primitive and dictionary columns come back as read-only views over the
+        # shared page cache instead of private copies in every worker
+        table = feather.read_table(_dataset_path(dataset_id), columns=missing, memory_map=True)
+        loaded = table.to_pandas(split_blocks=True)
     except Exception as e:
-        logger.error(f"Error loading pickle file {dataset_id}: {e}")
+        logger.error(f"Error loading dataset {dataset_id}: {e}")
         return None
 
+    if resident is not None:
+        merged = pd.concat([resident, loaded], axis=1)
+        # Keep the cached frame in file column order
+        loaded = merged[[c for c in all_columns if c in merged.columns]]
+
+    dataset_cache.put(dataset_id, loaded, shared_bytes=_mapped_nbytes(loaded))
+    return loaded[wanted].copy(deep=False)
+
+def register_derived_cache(cache):
+    """Have cache.invalidate(dataset_id) called whenever a dataset is forgotten."""
+    _derived_caches.append(cache)
+
+def forget_dataset(dataset_id: str):
+    """Drop everything held in memory for the dataset, in every registered cache."""
+    for cache in _derived_caches:
+        cache.invalidate(dataset_id)
+
+def dataset_exists(dataset_id: str) -> bool:
+    return os.path.exists(_dataset_path(dataset_id)) or os.path.exists(_legacy_path(dataset_id))
+
 def delete_dataset(dataset_id: str):
-    path = os.path.join(STORAGE_DIR, f"{dataset_id}.pkl")
-    if os.path.exists(path):
-        os.remove(path)
+    for path in (
+        _dataset_path(dataset_id),
+        _legacy_path(dataset_id),
+        _profile_path(dataset_id),
+        _status_path(dataset_id),
+        _zone_map_path(dataset_id),
+        _cube_path(dataset_id),
+    ):
+        if os.path.exists(path):
+            os.remove(path)
+    # After the files are gone, so a concurrent request can't re-cache them
+    forget_dataset(dataset_id)
 
-def get_dataset_info(df: pd.DataFrame) -> dict:
+def get_cache_stats() -> dict:
+    return dataset_cache.stats()
 
-    column_types = {}
-    stats = {}
+def write_profile(dataset_id: str, df: pd.DataFrame) -> dict:
+    info = get_dataset_info(df)
 
-    for col in df.columns:
+    _write_json(_profile_path(dataset_id), {"version": PROFILE_VERSION, **info})
+    return info
+
+def _read_versioned(path: str, version: int) -> dict | None:
+    """A JSON sidecar without its version key, or None if missing, unreadable or outdated."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Discarding unreadable {path}: {e}")
+        return None
+    return data if data.pop("version", None) == version else None
 
-        if pd.api.types.is_numeric_dtype(df[col]):
-            column_types[col] = "numeric"
+def load_profile(dataset_id: str) -> dict | None:
+    """The dataset's stored profile, rebuilt if missing or from an older profiler."""
+    path = _profile_path(dataset_id)
+    profile = _read_versioned(path, PROFILE_VERSION)
+    if profile is not None:
+        return profile
 
-            stats[col] = {
-                "type": "numeric",
-                "mean": float(df[col].mean()),
-                "min": float(df[col].min()),
-                "max": float(df[col].max()),
-                "sum": float(df[col].sum()),
-                "null_count": int(df[col].isna().sum()),
-                "unique_count": int(df[col].nunique())
-            }
+    with _rebuild_lock(path):
+        # Another request may have rebuilt it while this one waited
+        profile = _read_versioned(path, PROFILE_VERSION)
+        if profile is not None:
+            return profile
 
-        else:
-            column_types[col] = "categorical"
-
-            top_vals = (
-                df[col]
-                .value_counts()
-                .head(5)
-                .to_dict()
-            )
-
-            stats[col] = {
-                "type": "categorical",
-                "null_count": int(df[col].isna().sum()),
-                "unique_count": int(df[col].nunique()),
-                "top_values": [
-                    {"value": str(k), "count": int(v)}
-                    for k, v in top_vals.items()
-                ]
-            }
+        df = load_dataset(dataset_id)
+        if df is None:
+            return None
+
+        logger.info(f"Rebuilding profile for dataset {dataset_id}.")
+        return write_profile(dataset_id, df)
+
+def write_cube(dataset_id: str, df: pd.DataFrame) -> dict:
+    cube = build_cube(df)
+    _write_json(_cube_path(dataset_id), {"version": CUBE_VERSION, **cube})
+    cube_cache.put(dataset_id, cube)
+    return cube
+
+def load_cube(dataset_id: str) -> dict | None:
+    """The dataset's aggregate cube, from memory or its sidecar, rebuilt if
+    missing or outdated."""
+    cube = cube_cache.get(dataset_id)
+    if cube is not None:
+        return cube
+
+    path = _cube_path(dataset_id)
+    cube = _read_versioned(path, CUBE_VERSION)
+    if cube is None:
+        with _rebuild_lock(path):
+            cube = _read_versioned(path, CUBE_VERSION)
+            if cube is None:
+                df = load_dataset(dataset_id)
+                if df is None:
+                    return None
+
+                logger.info(f"Rebuilding cube for dataset {dataset_id}.")
+                return write_cube(dataset_id, df)
+
+    cube_cache.put(dataset_id, cube)
+    return cube
+
+def write_status(dataset_id: str, **fields) -> dict:
+    """Merge fields into the dataset's processing status sidecar."""
+    status = {**(load_status(dataset_id) or {}), **fields, "updated_at": time.time()}
+    _write_json(_status_path(dataset_id), status)
+    return status
+
+def load_status(dataset_id: str) -> dict | None:
+    path = _status_path(dataset_id)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def records(df: pd.DataFrame) -> list[dict]:
+    """Rows as JSON-ready dicts: timestamps as strings, missing values as ""."""
+    missing = df.isna()
+    # Object first: categoricals and datetimes can't take "" as a fill value
+    out = df.astype(object)
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            out[col] = df[col].astype(str)
+    return out.mask(missing, "").to_dict(orient="records")
+
+def _preview(df: pd.DataFrame, rows: int = 5) -> list[dict]:
+    return records(df.head(rows))
+
+def get_dataset_info(df: pd.DataFrame) -> dict:
+    stats = profile_columns(df)
 
     return {
         "rows": len(df),
         "columns": list(df.columns),
-        "column_types": column_types,
-        "preview": df.head(5).fillna("").to_dict(orient="records"),
+        "column_types": {col: col_stats["type"] for col, col_stats in stats.items()},
+        "preview": _preview(df),
         "stats": stats
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,101 @@
+import os
+import threading
+import logging
+from collections import OrderedDict
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Default budget of 512 MB, override with DATASET_CACHE_MAX_BYTES (0 disables caching)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+class DatasetCache:
+    """Process-wide LRU cache of loaded DataFrames, bounded by total bytes.
+
+    An entry may hold only some of a dataset's columns; a lookup is a hit
+    only when every requested column is already resident.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[pd.DataFrame, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, dataset_id: str, columns: list[str] | None = None) -> pd.DataFrame | None:
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+            if entry is None or (columns is not None and not set(columns) <= set(entry[0].columns)):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(dataset_id)
+            self.hits += 1
+            return entry[0] if columns is None else entry[0][columns]
+
+    def peek(self, dataset_id: str) -> pd.DataFrame | None:
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+            return entry[0] if entry is not None else None
+
+    def put(self, dataset_id: str, df: pd.DataFrame, shared_bytes: int = 0):
+        # Memory-mapped columns live in the OS page cache shared by all workers,
+        # so only the privately owned part counts against this process' budget
+        size = max(frame_nbytes(df) - shared_bytes, 0)
+
+        with self._lock:
+            self._remove(dataset_id)
+
+            # A frame bigger than the whole budget would just flush everything else
+            if size > self.max_bytes:
+                logger.info(f"Dataset {dataset_id} ({size} bytes) exceeds cache budget, not cached.")
+                return
+
+            self._entries[dataset_id] = (df, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                evicted_id, _ = next(iter(self._entries.items()))
+                self._remove(evicted_id)
+                self.evictions += 1
+                logger.info(f"Evicted dataset {evicted_id} from cache.")
+
+    def invalidate(self, dataset_id: str):
+        with self._lock:
+            self._remove(dataset_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _remove(self, dataset_id: str):
+        entry = self._entries.pop(dataset_id, None)
+        if entry is not None:
+            self.current_bytes -= entry[1]
+
+
+dataset_cache = DatasetCache(
+    max_bytes=int(os.getenv("DATASET_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+)
@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+
+# Filters are a list of {"column", "op", "value"} conditions, all of which a
+# row must meet. Comparisons against a categorical column are evaluated once
+# per category and mapped through the codes, not once per row.
+#
+# Datasets are stored with a zone map: each column's min, max and missing
+# count per batch of rows. A batch whose zones rule out any condition is
+# skipped without looking at its rows.
+
+OPS = {"eq", "ne", "lt", "le", "gt", "ge", "in", "contains", "is_null", "not_null"}
+VALUELESS_OPS = {"is_null", "not_null"}
+
+
+class FilterError(ValueError):
+    """A filter that cannot be applied to this dataset; the message is user-facing."""
+
+
+def normalize_filters(filters: list | None) -> list[dict]:
+    """Validated filters in a canonical form, suitable for hashing."""
+    normalized = []
+    for f in filters or []:
+        if not isinstance(f, dict) or not f.get("column"):
+            raise FilterError("Each filter needs a column.")
+        op = f.get("op") or "eq"
+        if op not in OPS:
+            raise FilterError(f"Unsupported filter operator '{op}'.")
+
+        value = None if op in VALUELESS_OPS else f.get("value")
+        if op == "in":
+            if not isinstance(value, list):
+                raise FilterError("The 'in' operator needs a list of values.")
+            value = sorted(value, key=str)
+        elif value is None and op not in VALUELESS_OPS:
+            raise FilterError(f"Filter on '{f['column']}' needs a value.")
+
+        normalized.append({"column": f["column"], "op": op, "value": value})
+
+    return sorted(normalized, key=lambda f: (f["column"], f["op"], str(f["value"])))
+
+
+def filter_columns(filters: list[dict]) -> list[str]:
+    return list(dict.fromkeys(f["column"] for f in filters))
+
+
+def _coerce(series: pd.Series, value):
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return [_coerce(series, v) for v in value]
+    try:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return pd.Timestamp(value)
+        if pd.api.types.is_bool_dtype(series) and isinstance(value, str):
+            return value.strip().lower() in ("true", "1", "yes")
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            return float(value)
+    except (TypeError, ValueError):
+        raise FilterError(f"'{value}' is not a valid value for column '{series.name}'.")
+    return value
+
+
+def _compare(values: pd.Series, op: str, value) -> np.ndarray:
+    if op == "eq":
+        result = values == value
+    elif op == "ne":
+        result = values != value
+    elif op == "in":
+        result = values.isin(value)
+    elif op == "contains":
+        result = values.astype(str).str.contains(str(value), case=False, regex=False)
+    else:
+        try:
+            result = {
+                "lt": values.lt, "le": values.le, "gt": values.gt, "ge": values.ge,
+            }[op](value)
+        except TypeError:
+            raise FilterError(f"Cannot compare column '{values.name}' with '{value}'.")
+    return result.fillna(False).to_numpy(dtype=bool)
+
+
+def condition_mask(series: pd.Series, op: str, value) -> np.ndarray:
+    """Rows of one column that meet one condition."""
+    if op == "is_null":
+        return series.isna().to_numpy()
+    if op == "not_null":
+        return series.notna().to_numpy()
+
+    value = _coerce(series, value)
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        per_category = _compare(pd.Series(series.cat.categories, name=series.name), op, value)
+        # Missing values (code -1) never meet a comparison
+        return np.append(per_category, op == "ne")[codes]
+
+    mask = _compare(series, op, value)
+    if op == "ne":
+        # Consistent with the categorical path: null is "not equal" to anything
+        mask |= series.isna().to_numpy()
+    return mask
+
+
+def filter_mask(df: pd.DataFrame, filters: list[dict]) -> np.ndarray:
+    """Rows of df that meet every normalized filter."""
+    mask = np.ones(len(df), dtype=bool)
+    for f in filters:
+        if f["column"] not in df.columns:
+            raise FilterError(f"Column '{f['column']}' not found.")
+        mask &= condition_mask(df[f["column"]], f["op"], f["value"])
+    return mask
+
+
+def _zone_value(series: pd.Series, value):
+    value = _coerce(series, value)
+    if isinstance(value, list):
+        return [_zone_value(series, v) for v in value]
+    # Zone maps record timestamps as integer nanoseconds
+    return value.value if isinstance(value, pd.Timestamp) else value
+
+
+def _zone_may_match(zone: dict, rows: int, op: str, value) -> bool:
+    nulls = zone["nulls"]
+    if op == "is_null":
+        return nulls > 0
+    if op == "not_null":
+        return nulls < rows
+    if nulls == rows:
+        # Only missing values: nothing compares true except "not equal"
+        return op == "ne"
+    if "min" not in zone or op == "contains":
+        return True
+
+    lo, hi = zone["min"], zone["max"]
+    try:
+        if op == "eq":
+            return lo <= value <= hi
+        if op == "ne":
+            return not (lo == hi == value and nulls == 0)
+        if op == "in":
+            return any(lo <= v <= hi for v in value)
+        if op == "lt":
+            return lo < value
+        if op == "le":
+            return lo <= value
+        if op == "gt":
+            return hi > value
+        if op == "ge":
+            return hi >= value
+    except TypeError:
+        # Bounds of another type (e.g. text vs number) can't rule anything out
+        return True
+    return True
+
+
+def matching_rows(df: pd.DataFrame, filters: list[dict], zones: list[dict] | None = None) -> np.ndarray:
+    """Positions of the rows of df that meet every normalized filter.
+
+    With the dataset's zone map, only batches that may contain a match are
+    evaluated; a zone map that doesn't cover df row for row is ignored.
+    """
+    if not filters:
+        return np.arange(len(df))
+    if not zones or sum(zone["rows"] for zone in zones) != len(df):
+        return np.flatnonzero(filter_mask(df, filters))
+
+    for f in filters:
+        if f["column"] not in df.columns:
+            raise FilterError(f"Column '{f['column']}' not found.")
+    values = [_zone_value(df[f["column"]], f["value"]) for f in filters]
+
+    matches = []
+    start = 0
+    for zone in zones:
+        stop = start + zone["rows"]
+        if all(
+            _zone_may_match(zone["columns"][f["column"]], zone["rows"], f["op"], value)
+            for f, value in zip(filters, values)
+        ):
+            matches.append(np.flatnonzero(filter_mask(df.iloc[start:stop], filters)) + start)
+        start = stop
+
+    return np.concatenate(matches) if matches else np.empty(0, dtype=np.int64)
@@ -0,0 +1,150 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from services.data_processor import load_dataset, dataset_exists, forget_dataset, register_derived_cache
+
+# A histogram is read off a column's sorted finite values: each bin count is
+# the distance between two binary searches, and every edge strategy needs
+# only min, max or quantiles, which are direct lookups. The sorted array is
+# built once per (dataset, column) and kept, so changing the bin count or
+# strategy costs O(bins log n) instead of another full-column pass.
+
+BINNINGS = {"width", "quantile", "fd"}
+DEFAULT_BINS = 10
+MAX_BINS = 200
+SORTED_COLUMN_CACHE_BYTES = int(os.getenv("SORTED_COLUMN_CACHE_BYTES", 256 * 1024 * 1024))
+
+
+def sorted_values(series: pd.Series) -> np.ndarray:
+    """Finite numeric values of a column in ascending order."""
+    # Timestamps are not measures; a datetime column has no numeric values
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return np.empty(0)
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    values = values[np.isfinite(values)]
+    values.sort()
+    return values
+
+
+def _quantiles(values: np.ndarray, q: np.ndarray) -> np.ndarray:
+    # Linear interpolation between order statistics, as np.quantile does,
+    # without re-partitioning an array that is already sorted
+    position = q * (len(values) - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def bin_edges(values: np.ndarray, bins: int, binning: str) -> np.ndarray:
+    """Bin edges over sorted, non-empty values for the given strategy.
+
+    "width" splits [min, max] into equal bins, "quantile" puts roughly the
+    same number of values in each bin, and "fd" picks the bin count from
+    the Freedman-Diaconis rule (width 2 * IQR / n^(1/3)), ignoring `bins`.
+    """
+    lo, hi = values[0], values[-1]
+    if lo == hi:
+        # Same convention as np.histogram for a constant column
+        lo, hi = lo - 0.5, hi + 0.5
+
+    if binning == "quantile":
+        edges = np.unique(_quantiles(values, np.linspace(0, 1, bins + 1)))
+        return edges if len(edges) > 1 else np.array([lo, hi])
+
+    if binning == "fd":
+        q1, q3 = _quantiles(values, np.array([0.25, 0.75]))
+        width = 2 * (q3 - q1) / np.cbrt(len(values))
+        bins = int(np.ceil((hi - lo) / width)) if width > 0 else DEFAULT_BINS
+        bins = min(max(bins, 1), MAX_BINS)
+
+    return np.linspace(lo, hi, bins + 1)
+
+
+def histogram(values: np.ndarray, bins: int, binning: str) -> tuple[np.ndarray, np.ndarray]:
+    """(counts, edges) over sorted values, with np.histogram's bin semantics:
+    half-open bins except the last, which includes its right edge."""
+    edges = bin_edges(values, bins, binning)
+    positions = np.searchsorted(values, edges, side="left")
+    positions[-1] = np.searchsorted(values, edges[-1], side="right")
+    return np.diff(positions), edges
+
+
+class SortedColumnCache:
+    """LRU of sorted column values keyed by (dataset_id, column), bounded in bytes.
+
+    Cached arrays are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: OrderedDict[tuple[str, str], np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, str]) -> np.ndarray | None:
+        with self._lock:
+            values = self._entries.get(key)
+            if values is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return values
+
+    def put(self, key: tuple[str, str], values: np.ndarray):
+        if values.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous.nbytes
+            self._entries[key] = values
+            self.nbytes += values.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+    def invalidate(self, dataset_id: str):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == dataset_id]:
+                self.nbytes -= self._entries.pop(key).nbytes
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+sorted_column_cache = SortedColumnCache(SORTED_COLUMN_CACHE_BYTES)
+register_derived_cache(sorted_column_cache)
+
+
+def sorted_column(dataset_id: str, column: str) -> np.ndarray | None:
+    """Cached sorted finite values of one column; None if the dataset is missing."""
+    if not dataset_exists(dataset_id):
+        forget_dataset(dataset_id)
+        return None
+
+    key = (dataset_id, column)
+    values = sorted_column_cache.get(key)
+    if values is not None:
+        return values
+
+    df = load_dataset(dataset_id, columns=[column])
+    if df is None:
+        return None
+
+    values = sorted_values(df[column])
+    values.flags.writeable = False
+    sorted_column_cache.put(key, values)
+    return values
@@ -0,0 +1,256 @@
+import os
+import time
+import random
+import threading
+import asyncio
+import json
+import logging
+import httpx
+from services.llm_cache import llm_cache, cache_key
+
+logger = logging.getLogger(__name__)
+
+# Point LLM_BASE_URL at any OpenAI-compatible server (e.g. a local stub) to
+# run without Groq; no API key is required in that case
+DEFAULT_BASE_URL = "https://api.groq.com/openai/v1"
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", DEFAULT_BASE_URL).rstrip("/")
+LLM_MODEL = os.getenv("LLM_MODEL", "llama-3.3-70b-versatile")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 30))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+LLM_BACKOFF_SECONDS = float(os.getenv("LLM_BACKOFF_SECONDS", 0.5))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 20))
+
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+_sync_client: httpx.Client | None = None
+_async_client: httpx.AsyncClient | None = None
+_async_client_loop: asyncio.AbstractEventLoop | None = None
+_sync_client_lock = threading.Lock()
+
+
+class LLMError(Exception):
+    pass
+
+
+def _api_key() -> str | None:
+    return os.getenv("LLM_API_KEY") or os.getenv("GROQ_API_KEY")
+
+
+def llm_configured() -> bool:
+    return bool(_api_key()) or LLM_BASE_URL != DEFAULT_BASE_URL
+
+
+def _client_options() -> dict:
+    headers = {"Content-Type": "application/json"}
+    if _api_key():
+        headers["Authorization"] = f"Bearer {_api_key()}"
+
+    return {
+        "base_url": LLM_BASE_URL,
+        "headers": headers,
+        "timeout": httpx.Timeout(LLM_TIMEOUT, connect=min(LLM_TIMEOUT, 10)),
+        "limits": httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_CONNECTIONS,
+        ),
+    }
+
+
+def get_client() -> httpx.Client:
+    global _sync_client
+    with _sync_client_lock:
+        if _sync_client is None:
+            _sync_client = httpx.Client(**_client_options())
+    return _sync_client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    global _async_client, _async_client_loop
+    # Pooled connections belong to the event loop that opened them
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(**_client_options())
+        _async_client_loop = loop
+    return _async_client
+
+
+async def close_clients():
+    global _sync_client, _async_client
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def _payload(messages: list[dict], temperature: float, max_tokens: int, model: str | None) -> dict:
+    return {
+        "model": model or LLM_MODEL,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }
+
+
+def _delta(line: str) -> str | None:
+    """Content delta carried by one server-sent event line, if any."""
+    if not line.startswith("data:"):
+        return None
+    data = line[len("data:"):].strip()
+    if not data or data == "[DONE]":
+        return None
+    try:
+        return json.loads(data)["choices"][0]["delta"].get("content")
+    except (ValueError, KeyError, IndexError) as e:
+        raise LLMError(f"Malformed LLM stream chunk: {e}")
+
+
+def _backoff(attempt: int, response: httpx.Response | None) -> float:
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        # A server asking for a long pause must not hold the request for
+        # longer than a single call is allowed to take
+        return min(float(retry_after), LLM_TIMEOUT)
+    return LLM_BACKOFF_SECONDS * (2 ** attempt) * (1 + random.random() / 2)
+
+
+def _should_retry(attempt: int, response: httpx.Response | None) -> bool:
+    if attempt >= LLM_MAX_RETRIES:
+        return False
+    return response is None or response.status_code in RETRY_STATUS_CODES
+
+
+def _content(response: httpx.Response) -> str:
+    if response.is_error:
+        raise LLMError(f"LLM API error {response.status_code}: {response.text}")
+    try:
+        return response.json()["choices"][0]["message"]["content"].strip()
+    except (ValueError, KeyError, IndexError) as e:
+        raise LLMError(f"Malformed LLM response: {e}")
+
+
+def _cached(payload: dict, cache: bool) -> tuple[str | None, str | None]:
+    if not cache or llm_cache is None:
+        return None, None
+    key = cache_key(payload)
+    return key, llm_cache.get(key)
+
+
+def _store(key: str | None, content: str) -> str:
+    if key is not None:
+        llm_cache.set(key, content)
+    return content
+
+
+def get_llm_cache_stats() -> dict | None:
+    return llm_cache.stats() if llm_cache is not None else None
+
+
+def chat_completion(
+    messages: list[dict],
+    temperature: float = 0.3,
+    max_tokens: int = 256,
+    model: str | None = None,
+    cache: bool = True,
+) -> str:
+    """Blocking chat completion for sync routes; retries transient failures.
+
+    Identical requests are answered from the response cache unless cache=False.
+    """
+    payload = _payload(messages, temperature, max_tokens, model)
+
+    key, cached = _cached(payload, cache)
+    if cached is not None:
+        return cached
+
+    attempt = 0
+    while True:
+        response = None
+        try:
+            response = get_client().post("/chat/completions", json=payload)
+            if not _should_retry(attempt, response) or not response.is_error:
+                return _store(key, _content(response))
+        except httpx.HTTPError as e:
+            if not _should_retry(attempt, None):
+                raise LLMError(f"LLM request failed: {e}")
+
+        delay = _backoff(attempt, response)
+        logger.warning(f"LLM call failed (attempt {attempt + 1}), retrying in {delay:.1f}s")
+        time.sleep(delay)
+        attempt += 1
+
+
+async def achat_completion(
+    messages: list[dict],
+    temperature: float = 0.3,
+    max_tokens: int = 256,
+    model: str | None = None,
+    cache: bool = True,
+) -> str:
+    """Async counterpart of chat_completion for async def routes."""
+    payload = _payload(messages, temperature, max_tokens, model)
+
+    # The response cache is SQLite; keep its reads and writes off the event loop
+    key, cached = await asyncio.to_thread(_cached, payload, cache)
+    if cached is not None:
+        return cached
+
+    attempt = 0
+    while True:
+        response = None
+        try:
+            response = await get_async_client().post("/chat/completions", json=payload)
+            if not _should_retry(attempt, response) or not response.is_error:
+                return await asyncio.to_thread(_store, key, _content(response))
+        except httpx.HTTPError as e:
+            if not _should_retry(attempt, None):
+                raise LLMError(f"LLM request failed: {e}")
+
+        delay = _backoff(attempt, response)
+        logger.warning(f"LLM call failed (attempt {attempt + 1}), retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def astream_completion(
+    messages: list[dict],
+    temperature: float = 0.3,
+    max_tokens: int = 256,
+    model: str | None = None,
+):
+    """Yield completion text as the model produces it.
+
+    Failures before the first token are retried like achat_completion; once
+    tokens have been relayed a failure is raised as LLMError. Closing the
+    generator early (e.g. the client went away) closes the upstream stream.
+    """
+    payload = {**_payload(messages, temperature, max_tokens, model), "stream": True}
+
+    attempt = 0
+    streamed = False
+    while True:
+        response = None
+        try:
+            async with get_async_client().stream("POST", "/chat/completions", json=payload) as response:
+                if response.is_error:
+                    await response.aread()
+                    if not _should_retry(attempt, response):
+                        raise LLMError(f"LLM API error {response.status_code}: {response.text}")
+                else:
+                    async for line in response.aiter_lines():
+                        delta = _delta(line)
+                        if delta:
+                            streamed = True
+                            yield delta
+                    return
+        except httpx.HTTPError as e:
+            # Tokens already relayed cannot be taken back, so only retry
+            # while nothing has been sent
+            if streamed or not _should_retry(attempt, None):
+                raise LLMError(f"LLM request failed: {e}")
+
+        delay = _backoff(attempt, response)
+        logger.warning(f"LLM stream failed (attempt {attempt + 1}), retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+        attempt += 1
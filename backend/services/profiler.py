@@ -0,0 +1,143 @@
+import os
+import numpy as np
+import pandas as pd
+from services.sketches import approximate_profile, SKETCH_CHUNK_ROWS
+
+# Numeric columns are reduced together in blocks of this many columns, one
+# slice of rows at a time, so the float64 working copy never holds more than
+# NUMERIC_BLOCK_CELLS values however long or wide the frame is
+NUMERIC_BLOCK_COLUMNS = 64
+NUMERIC_BLOCK_CELLS = int(os.getenv("NUMERIC_BLOCK_CELLS", 4_000_000))
+TOP_VALUES = 5
+
+# Above this many rows distinct counts and top values come from sketches
+# (see services/sketches.py for error bounds) and are flagged "approximate"
+APPROX_PROFILE_ROWS = int(os.getenv("APPROX_PROFILE_ROWS", 1_000_000))
+LOW_CARDINALITY = 100
+
+
+def is_numeric_column(series: pd.Series) -> bool:
+    # Booleans are profiled as categories (True/False counts), not as numbers
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def column_type(series: pd.Series) -> str:
+    if is_numeric_column(series):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "datetime"
+    return "categorical"
+
+
+def rounded(value: float | None, digits: int = 2) -> float | None:
+    return round(value, digits) if value is not None else None
+
+
+def _json_float(value) -> float | None:
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def _profile_numeric_block(df: pd.DataFrame, columns: list, approximate: bool) -> dict:
+    counts = np.zeros(len(columns), dtype=np.int64)
+    sums = np.zeros(len(columns))
+    mins = np.full(len(columns), np.nan)
+    maxs = np.full(len(columns), np.nan)
+
+    slice_rows = max(NUMERIC_BLOCK_CELLS // len(columns), 1)
+    for start in range(0, len(df), slice_rows):
+        values = df[columns].iloc[start:start + slice_rows].to_numpy(dtype="float64", na_value=np.nan)
+        counts += np.count_nonzero(~np.isnan(values), axis=0)
+        sums += np.nansum(values, axis=0)
+        # fmin/fmax skip NaN and return NaN for all-null columns without warnings
+        mins = np.fmin(mins, np.fmin.reduce(values, axis=0))
+        maxs = np.fmax(maxs, np.fmax.reduce(values, axis=0))
+
+    stats = {}
+    for i, col in enumerate(columns):
+        count = int(counts[i])
+        stats[col] = {
+            "type": "numeric",
+            "mean": _json_float(sums[i] / count) if count else None,
+            "min": _json_float(mins[i]),
+            "max": _json_float(maxs[i]),
+            "sum": _json_float(sums[i]),
+            "null_count": len(df) - count,
+        }
+        if approximate:
+            stats[col].update(approximate_profile(df[col], TOP_VALUES))
+        else:
+            stats[col]["unique_count"] = int(df[col].nunique())
+    return stats
+
+
+def _few_distinct_values(series: pd.Series) -> bool:
+    # Exact counting is cheaper than hashing for categoricals and for columns
+    # whose first slice already shows only a handful of distinct values
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return True
+    return series.iloc[:SKETCH_CHUNK_ROWS].nunique() <= LOW_CARDINALITY
+
+
+def _profile_categorical(series: pd.Series, approximate: bool) -> dict:
+    if approximate and not _few_distinct_values(series):
+        return {
+            "type": "categorical",
+            "null_count": int(series.isna().sum()),
+            **approximate_profile(series, TOP_VALUES),
+        }
+
+    # A single hash pass yields nulls, distinct count and top values together
+    counts = series.value_counts(dropna=False)
+    counts = counts[counts > 0]
+
+    null_mask = counts.index.isna()
+    non_null = counts[~null_mask]
+
+    return {
+        "type": "categorical",
+        "null_count": int(counts[null_mask].sum()),
+        "unique_count": len(non_null),
+        "top_values": [
+            {"value": str(k), "count": int(v)}
+            for k, v in non_null.head(TOP_VALUES).items()
+        ],
+    }
+
+
+def _profile_datetime(series: pd.Series, approximate: bool) -> dict:
+    stats = _profile_categorical(series, approximate)
+    return {
+        **stats,
+        "type": "datetime",
+        "min": str(series.min()) if stats["null_count"] < len(series) else None,
+        "max": str(series.max()) if stats["null_count"] < len(series) else None,
+    }
+
+
+def profile_columns(df: pd.DataFrame) -> dict:
+    """Per-column stats for every column, in frame order.
+
+    Numeric entries carry mean/min/max/sum (None when undefined), categorical
+    ones carry top_values and datetime ones top_values plus min/max as
+    strings; all carry null_count and unique_count. On frames
+    longer than APPROX_PROFILE_ROWS, unique_count and top_values are sketched
+    and the entry is marked "approximate" along with its error bounds.
+    """
+    numeric_cols = [col for col in df.columns if is_numeric_column(df[col])]
+    approximate = len(df) > APPROX_PROFILE_ROWS
+
+    stats = {}
+    for start in range(0, len(numeric_cols), NUMERIC_BLOCK_COLUMNS):
+        block = numeric_cols[start:start + NUMERIC_BLOCK_COLUMNS]
+        stats.update(_profile_numeric_block(df, block, approximate))
+
+    for col in df.columns:
+        if col in stats:
+            continue
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            stats[col] = _profile_datetime(df[col], approximate)
+        else:
+            stats[col] = _profile_categorical(df[col], approximate)
+
+    return {col: stats[col] for col in df.columns}
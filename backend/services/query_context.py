@@ -0,0 +1,204 @@
+import os
+import re
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from services.data_processor import load_profile, dataset_exists, forget_dataset, register_derived_cache
+
+# Upper bound on the dataset description sent with every question. Columns
+# are ranked by relevance to the question and described in full, briefly or
+# not at all until the budget is spent, so prompt size stays flat however
+# wide the dataset is.
+QUERY_CONTEXT_TOKENS = int(os.getenv("QUERY_CONTEXT_TOKENS", 1500))
+QUERY_CONTEXT_CACHE_ENTRIES = int(os.getenv("QUERY_CONTEXT_CACHE_ENTRIES", 64))
+SAMPLE_ROWS = 5
+SAMPLE_COLUMNS = 8
+# Part of the budget held back from column details for sample rows
+SAMPLE_SHARE = 0.25
+# Long text values are cut to this many characters in the prompt
+MAX_VALUE_CHARS = 40
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token holds well enough for English and numbers
+    # without pulling in a tokenizer for one model family
+    return len(text) // 4 + 1
+
+
+def _words(text: str) -> set[str]:
+    return set(_WORD.findall(text.lower()))
+
+
+def _number(value) -> str:
+    # The prompt asks for exact figures, so only trim past the cents
+    return "null" if value is None else str(round(value, 2))
+
+
+def _clip(value):
+    if isinstance(value, str) and len(value) > MAX_VALUE_CHARS:
+        return value[:MAX_VALUE_CHARS] + "..."
+    return value
+
+
+@dataclass
+class ColumnContext:
+    name: str
+    position: int
+    detail: str
+    brief: str
+    name_words: set[str]
+    value_words: set[str]
+
+
+@dataclass
+class DatasetContext:
+    rows: int
+    columns: list[ColumnContext]
+    preview: list[dict]
+
+
+def _describe(position: int, col: str, col_stats: dict) -> ColumnContext:
+    if col_stats["type"] == "numeric":
+        detail = (
+            f"- {col} (numeric): min={_number(col_stats['min'])}, max={_number(col_stats['max'])}, "
+            f"mean={_number(col_stats['mean'])}, sum={_number(col_stats['sum'])}"
+        )
+        values = []
+    elif col_stats["type"] == "datetime":
+        detail = f"- {col} (datetime): from {col_stats['min']} to {col_stats['max']}"
+        values = []
+    else:
+        values = [v["value"] for v in col_stats["top_values"]]
+        top = {_clip(v["value"]): v["count"] for v in col_stats["top_values"]}
+        detail = f"- {col} (categorical): {col_stats['unique_count']} unique values, top: {top}"
+
+    return ColumnContext(
+        name=col,
+        position=position,
+        detail=detail,
+        brief=f"- {col} ({col_stats['type']})",
+        name_words=_words(col.replace("_", " ")),
+        value_words=_words(" ".join(values)),
+    )
+
+
+def _build(profile: dict) -> DatasetContext:
+    return DatasetContext(
+        rows=profile["rows"],
+        columns=[_describe(i, col, s) for i, (col, s) in enumerate(profile["stats"].items())],
+        preview=profile["preview"],
+    )
+
+
+class QueryContextCache:
+    """LRU of per-dataset column descriptions, built once from the stored profile."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, DatasetContext] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, dataset_id: str) -> DatasetContext | None:
+        if not dataset_exists(dataset_id):
+            forget_dataset(dataset_id)
+            return None
+
+        with self._lock:
+            if dataset_id in self._entries:
+                self._entries.move_to_end(dataset_id)
+                return self._entries[dataset_id]
+
+        profile = load_profile(dataset_id)
+        if profile is None:
+            return None
+        context = _build(profile)
+
+        with self._lock:
+            self._entries[dataset_id] = context
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return context
+
+    def invalidate(self, dataset_id: str):
+        with self._lock:
+            self._entries.pop(dataset_id, None)
+
+
+query_context_cache = QueryContextCache(QUERY_CONTEXT_CACHE_ENTRIES)
+register_derived_cache(query_context_cache)
+
+
+def _relevance(column: ColumnContext, question: str, question_words: set[str]) -> float:
+    score = 0.0
+    if column.name.lower() in question:
+        score += 10
+    score += 3 * len(column.name_words & question_words)
+    score += len(column.value_words & question_words)
+    return score
+
+
+def rank_columns(context: DatasetContext, question: str) -> list[ColumnContext]:
+    """Columns most relevant to the question first; ties keep dataset order."""
+    question = question.lower()
+    question_words = _words(question)
+    return sorted(
+        context.columns,
+        key=lambda c: (-_relevance(c, question, question_words), c.position),
+    )
+
+
+def _sample_rows(context: DatasetContext, columns: list[str], rows: int) -> str:
+    # One compact JSON object per line
+    return "\n".join(
+        json.dumps({c: _clip(row.get(c)) for c in columns}, default=str)
+        for row in context.preview[:rows]
+    )
+
+
+def build_query_context(dataset_id: str, question: str, budget: int = QUERY_CONTEXT_TOKENS) -> str | None:
+    """Dataset description for the query prompt, compacted to about `budget` tokens.
+
+    Returns None when the dataset does not exist.
+    """
+    context = query_context_cache.get(dataset_id)
+    if context is None:
+        return None
+
+    header = f"Dataset info:\n- Rows: {context.rows}\n- Columns: {len(context.columns)}"
+    reserved = int(budget * SAMPLE_SHARE)
+    remaining = budget - reserved - estimate_tokens(header)
+
+    # Full detail for the most relevant columns, a name and type for the
+    # next ones, and a count of whatever does not fit
+    lines, described = [], []
+    ranked = rank_columns(context, question)
+    for column in ranked:
+        for line in (column.detail, column.brief):
+            cost = estimate_tokens(line)
+            if cost <= remaining:
+                lines.append(line)
+                described.append(column.name)
+                remaining -= cost
+                break
+        else:
+            break
+
+    omitted = len(ranked) - len(described)
+    if omitted:
+        lines.append(f"- ... {omitted} less relevant columns omitted")
+
+    sections = [header, "Column details:\n" + "\n".join(lines)]
+    remaining += reserved
+
+    # Sample rows restricted to the top columns, as many as still fit
+    sample_columns = described[:SAMPLE_COLUMNS]
+    for rows in range(min(SAMPLE_ROWS, len(context.preview)), 0, -1):
+        sample = _sample_rows(context, sample_columns, rows)
+        if estimate_tokens(sample) <= remaining:
+            sections.append("Sample rows:\n" + sample)
+            break
+
+    return "\n\n".join(sections)
@@ -0,0 +1,173 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from services.data_processor import load_dataset, load_zone_map, records, register_derived_cache
+from services.filters import FilterError, normalize_filters, filter_columns, matching_rows
+
+# A view of a dataset (its filters and sort order) is materialized once as
+# the ordered array of row positions it contains, and kept; every page of
+# that view is then a slice of the array and a take() of that many rows.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+ROW_VIEW_CACHE_BYTES = int(os.getenv("ROW_VIEW_CACHE_BYTES", 128 * 1024 * 1024))
+
+
+def parse_sort(sort: str | None) -> list[tuple[str, bool]]:
+    """"region,-revenue" -> [("region", True), ("revenue", False)] (column, ascending)."""
+    keys = []
+    for part in (sort or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        ascending = not part.startswith("-")
+        keys.append((part.lstrip("+-"), ascending))
+    return keys
+
+
+def _sort_key(series: pd.Series, ascending: bool) -> np.ndarray:
+    # Dense ranks of the values, nulls ranked last in either direction
+    codes, uniques = pd.factorize(series, sort=True)
+    codes = codes.astype(np.int64)
+    if not ascending:
+        codes = np.where(codes >= 0, len(uniques) - 1 - codes, codes)
+    codes[codes < 0] = len(uniques)
+    return codes
+
+
+def order_rows(df: pd.DataFrame, sort: list[tuple[str, bool]], rows: np.ndarray | None = None) -> np.ndarray:
+    """Positions of the given rows (default all), ordered by the sort keys.
+
+    The sort is stable, so ties (and an empty sort) keep file order.
+    """
+    if not sort:
+        return np.arange(len(df)) if rows is None else rows
+
+    subset = df if rows is None else df.iloc[rows]
+    if rows is None:
+        rows = np.arange(len(df))
+    # lexsort treats its last key as the primary one
+    keys = [_sort_key(subset[column], ascending) for column, ascending in reversed(sort)]
+    return rows[np.lexsort(keys)]
+
+
+class RowView:
+    """The ordered row positions of one (filters, sort) view of a dataset."""
+
+    def __init__(self, positions: np.ndarray):
+        self.positions = positions
+        self._ranks = None
+
+    @property
+    def nbytes(self) -> int:
+        return self.positions.nbytes + (self._ranks.nbytes if self._ranks is not None else 0)
+
+    def start_after(self, row: int) -> int:
+        """Index in the view just past row (a row id), for keyset pagination."""
+        if self._ranks is None:
+            ranks = np.full(int(self.positions.max(initial=-1)) + 1, -1, dtype=np.int64)
+            ranks[self.positions] = np.arange(len(self.positions))
+            self._ranks = ranks
+        if row < 0 or row >= len(self._ranks) or self._ranks[row] < 0:
+            raise FilterError(f"Cursor {row} is not part of this view.")
+        return int(self._ranks[row]) + 1
+
+
+class RowViewCache:
+    """LRU of row views keyed by (dataset_id, view key), bounded in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, str], RowView] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, str]) -> RowView | None:
+        with self._lock:
+            view = self._entries.get(key)
+            if view is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return view
+
+    def put(self, key: tuple[str, str], view: RowView):
+        with self._lock:
+            self._entries[key] = view
+            self._entries.move_to_end(key)
+            # Sizes are re-read each time: a view grows when it is first
+            # used with a cursor
+            while len(self._entries) > 1 and sum(v.nbytes for v in self._entries.values()) > self.max_bytes:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, dataset_id: str):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == dataset_id]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": sum(v.nbytes for v in self._entries.values()),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+row_view_cache = RowViewCache(ROW_VIEW_CACHE_BYTES)
+register_derived_cache(row_view_cache)
+
+
+def browse_rows(
+    dataset_id: str,
+    offset: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    sort: str | None = None,
+    filters: list | None = None,
+    after: int | None = None,
+) -> dict | None:
+    """One page of a dataset's rows under optional filters and sort.
+
+    Pages are addressed by offset, or by keyset: `after` is the row id of
+    the last row already seen (the previous page's next_cursor). Returns
+    None when the dataset does not exist; raises FilterError for a sort or
+    filter that does not fit it.
+    """
+    df = load_dataset(dataset_id)
+    if df is None:
+        return None
+
+    sort_keys = parse_sort(sort)
+    filters = normalize_filters(filters)
+    for column in [c for c, _ in sort_keys] + filter_columns(filters):
+        if column not in df.columns:
+            raise FilterError(f"Column '{column}' not found.")
+
+    key = (dataset_id, json.dumps([sort_keys, filters], sort_keys=True, default=str))
+    view = row_view_cache.get(key)
+    if view is None:
+        rows = matching_rows(df, filters, load_zone_map(dataset_id)) if filters else None
+        view = RowView(order_rows(df, sort_keys, rows))
+        row_view_cache.put(key, view)
+
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    start = view.start_after(after) if after is not None else max(offset, 0)
+    page = view.positions[start:start + limit]
+
+    return {
+        "dataset_id": dataset_id,
+        "total": len(view.positions),
+        "offset": start,
+        "limit": limit,
+        "row_ids": page.tolist(),
+        "rows": records(df.take(page)),
+        "next_cursor": int(page[-1]) if start + limit < len(view.positions) else None,
+    }
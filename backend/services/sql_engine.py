@@ -0,0 +1,164 @@
+import os
+import re
+import time
+import threading
+import duckdb
+import pyarrow as pa
+
+# Ad-hoc SQL runs in a throwaway in-memory DuckDB connection per query. Each
+# dataset is queried under an alias, through a view over the Arrow table on
+# its memory-mapped file, so DuckDB scans the stored columns in place. The
+# query itself cannot reach files, the network or extensions, and is
+# interrupted once it runs past its time limit.
+
+SQL_MAX_ROWS = int(os.getenv("SQL_MAX_ROWS", 100_000))
+SQL_TIMEOUT = float(os.getenv("SQL_TIMEOUT", 10))
+SQL_PAGE_ROWS = 1000
+MAX_PAGE_ROWS = 10_000
+SQL_THREADS = int(os.getenv("SQL_THREADS", 2))
+SQL_MEMORY_LIMIT = os.getenv("SQL_MEMORY_LIMIT", "1GB")
+
+_ALIAS = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,62}$")
+
+
+class SQLError(ValueError):
+    """The query was rejected or failed; the message is user-facing."""
+
+
+def validate_alias(alias: str):
+    if not _ALIAS.match(alias):
+        raise SQLError(f"'{alias}' is not a valid table name; use letters, digits and underscores.")
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _column_sql(field: pa.Field) -> str:
+    column = _quote(field.name)
+    # Missing floats are stored as NaN, which SQL aggregates and IS NULL
+    # don't treat as missing; narrow integers would overflow in arithmetic
+    if pa.types.is_floating(field.type):
+        return f"CASE WHEN isnan({column}) THEN NULL ELSE {column} END AS {column}"
+    if pa.types.is_integer(field.type) and field.type.bit_width < 64:
+        return f"CAST({column} AS BIGINT) AS {column}"
+    return column
+
+
+def _connect(tables: dict[str, pa.Table]) -> duckdb.DuckDBPyConnection:
+    con = duckdb.connect(":memory:", config={"threads": SQL_THREADS, "memory_limit": SQL_MEMORY_LIMIT})
+    for alias, table in tables.items():
+        # The stored table goes under a name no alias can take, and the alias
+        # is a view over it with SQL-friendly column types
+        stored = f"{alias}$stored"
+        con.register(stored, table)
+        columns = ", ".join(_column_sql(field) for field in table.schema)
+        con.execute(f"CREATE TEMP VIEW {_quote(alias)} AS SELECT {columns} FROM {_quote(stored)}")
+    # Locked, so a query can't turn file and network access back on
+    con.execute("SET enable_external_access = false")
+    con.execute("SET lock_configuration = true")
+    return con
+
+
+def _select_only(con: duckdb.DuckDBPyConnection, sql: str) -> str:
+    try:
+        statements = con.extract_statements(sql)
+    except duckdb.Error as e:
+        raise SQLError(str(e))
+    if len(statements) != 1:
+        raise SQLError("Send exactly one SQL statement.")
+    if statements[0].type != duckdb.StatementType.SELECT:
+        raise SQLError("Only SELECT queries are allowed.")
+    return statements[0].query.strip().rstrip(";")
+
+
+def _plain_types(batch: pa.RecordBatch) -> pa.RecordBatch:
+    # Decimal sums and 128-bit integers have no JSON number; send them as floats
+    arrays = []
+    for field, array in zip(batch.schema, batch.columns):
+        if pa.types.is_decimal(field.type):
+            array = array.cast(pa.float64())
+        arrays.append(array)
+    return pa.RecordBatch.from_arrays(arrays, names=batch.schema.names)
+
+
+class SQLQuery:
+    """A running read-only query whose result is read back page by page.
+
+    Construction validates and starts the query, raising SQLError for a
+    query that is not a single SELECT or fails to start. pages() then
+    yields lists of row dicts until the result, max_rows or the time limit
+    runs out; `truncated` and `rows` describe what was sent.
+    """
+
+    def __init__(
+        self,
+        tables: dict[str, pa.Table],
+        sql: str,
+        max_rows: int = SQL_MAX_ROWS,
+        page_rows: int = SQL_PAGE_ROWS,
+        timeout: float = SQL_TIMEOUT,
+    ):
+        self.max_rows = min(max(max_rows, 1), SQL_MAX_ROWS)
+        self.page_rows = min(max(page_rows, 1), MAX_PAGE_ROWS)
+        self.timeout = min(max(timeout, 0.1), SQL_TIMEOUT)
+        self.rows = 0
+        self.truncated = False
+        self.timed_out = False
+        self.started = time.monotonic()
+
+        for alias in tables:
+            validate_alias(alias)
+
+        self._con = _connect(tables)
+        self._timer = threading.Timer(self.timeout, self._interrupt)
+        self._timer.daemon = True
+        try:
+            query = _select_only(self._con, sql)
+            self._timer.start()
+            # One row past the limit tells a complete result from a cut one;
+            # the newline ends any trailing line comment in the query
+            result = self._con.execute(f"SELECT * FROM ({query}\n) LIMIT {self.max_rows + 1}")
+            self._reader = result.fetch_record_batch(self.page_rows)
+        except Exception as e:
+            self.close()
+            raise self._error(e)
+
+        self.columns = self._reader.schema.names
+        self.types = [str(field.type) for field in self._reader.schema]
+
+    def _interrupt(self):
+        self.timed_out = True
+        self._con.interrupt()
+
+    def _error(self, e: Exception) -> Exception:
+        if self.timed_out:
+            return SQLError(f"Query exceeded the {self.timeout:g}s time limit.")
+        if isinstance(e, (duckdb.Error, SQLError)):
+            return e if isinstance(e, SQLError) else SQLError(str(e))
+        return e
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def pages(self):
+        try:
+            for batch in self._reader:
+                remaining = self.max_rows - self.rows
+                if batch.num_rows > remaining:
+                    batch = batch.slice(0, remaining)
+                    self.truncated = True
+                if batch.num_rows:
+                    self.rows += batch.num_rows
+                    yield _plain_types(batch).to_pylist()
+                if self.truncated:
+                    break
+        except Exception as e:
+            raise self._error(e)
+        finally:
+            self.close()
+
+    def close(self):
+        self._timer.cancel()
+        self._con.close()
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# Calendar buckets a time series can be resampled into; weeks start on Monday
+BUCKETS = {"day": "D", "week": "W-SUN", "month": "M"}
+DEFAULT_MAX_POINTS = 1000
+MAX_POINTS = 10_000
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last point and, from each of threshold - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the average of the next bucket. Peaks and
+    troughs survive, unlike with striding or averaging. x must be sorted.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = x.astype("float64")
+    y = y.astype("float64")
+    # Bucket boundaries over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_start, next_stop = stop, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean()
+
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        kept[i + 1] = previous
+
+    return kept
+
+
+def aggregate_over_time(
+    x: pd.Series,
+    values: pd.Series,
+    aggregation: str,
+    bucket: str | None = None,
+    max_points: int | None = DEFAULT_MAX_POINTS,
+) -> pd.Series:
+    """Aggregate values per x in x order, optionally per calendar bucket,
+    and downsample the result with LTTB to at most max_points points.
+
+    Datetime x can be bucketed by day, week or month (labelled by the
+    bucket's first day); any other x is grouped by its raw values.
+    """
+    is_datetime = pd.api.types.is_datetime64_any_dtype(x)
+    if values.dtype == np.float32:
+        # Sums over float32 would accumulate in float32
+        values = values.astype("float64")
+
+    if bucket is not None and is_datetime:
+        x = x.dt.to_period(BUCKETS[bucket]).dt.start_time
+
+    grouped = getattr(values.groupby(x, observed=True), aggregation)().sort_index()
+
+    if max_points and len(grouped) > max_points:
+        if is_datetime:
+            positions = grouped.index.asi8
+        else:
+            positions = np.arange(len(grouped))
+        kept = lttb(positions, np.nan_to_num(grouped.to_numpy(dtype="float64")), max_points)
+        grouped = grouped.iloc[kept]
+
+    return grouped
@@ -0,0 +1,80 @@
+import os
+import time
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from services.data_processor import load_profile, load_cube, load_status, write_status
+
+logger = logging.getLogger(__name__)
+
+# Profiling, the aggregate cube and the AI summary run here after the upload
+# request has returned
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", 2))
+# Jobs live in the worker process that accepted the upload; a status that
+# hasn't moved for this long belongs to a job lost to a restart or crash
+UPLOAD_STALE_SECONDS = float(os.getenv("UPLOAD_STALE_SECONDS", 900))
+
+_executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix="upload")
+
+
+def submit(dataset_id: str, filename: str, summarize):
+    """Queue post-upload processing; progress is recorded in the status sidecar.
+
+    `summarize` takes the dataset profile and returns the AI summary (or None).
+    """
+    write_status(dataset_id, status="queued", stage="stored", progress=0.2, filename=filename)
+    _executor.submit(_process, dataset_id, summarize)
+
+
+def current_status(dataset_id: str) -> dict | None:
+    """The dataset's status sidecar, with abandoned jobs reported as failed."""
+    status = load_status(dataset_id)
+    if status is None:
+        return None
+
+    # Sidecars written before updated_at existed count as stale
+    if time.time() - status.get("updated_at", 0) <= UPLOAD_STALE_SECONDS:
+        return status
+    if status.get("status") in ("queued", "processing"):
+        return write_status(
+            dataset_id, status="failed", stage="failed",
+            error="Processing was interrupted. Please upload the file again.",
+        )
+    if status.get("summary_status") == "pending":
+        return write_status(dataset_id, summary_status="failed")
+    return status
+
+
+def _process(dataset_id: str, summarize):
+    try:
+        write_status(dataset_id, status="processing", stage="profiling", progress=0.5)
+        profile = load_profile(dataset_id)
+        if profile is None:
+            raise ValueError("Dataset file disappeared before profiling.")
+
+    except Exception as e:
+        traceback.print_exc()
+        logger.error(f"Background processing of dataset {dataset_id} failed: {e}")
+        write_status(dataset_id, status="failed", stage="failed", error=str(e))
+        return
+
+    # The dashboard only needs the profile; the cube and summary are filled in
+    # afterwards, so neither holds the dataset back
+    write_status(dataset_id, status="ready", stage="done", progress=1.0, summary_status="pending")
+
+    try:
+        # Charts asked for before it exists build it on demand instead
+        load_cube(dataset_id)
+    except Exception as e:
+        logger.error(f"Aggregating dataset {dataset_id} failed: {e}")
+
+    try:
+        summary = summarize(profile)
+        write_status(dataset_id, summary=summary, summary_status="done")
+    except Exception as e:
+        logger.error(f"AI summary of dataset {dataset_id} failed: {e}")
+        write_status(dataset_id, summary_status="failed")
+
+
+def shutdown():
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import profiler
+from services.sketches import HyperLogLog, FrequentItems, hash_values, approximate_profile
+
+
+@pytest.mark.parametrize("distinct", [1_000, 50_000, 400_000])
+def test_hll_relative_error_within_bound(distinct):
+    rng = np.random.default_rng(distinct)
+    # Every distinct value appears, some of them many times
+    values = np.concatenate([np.arange(distinct), rng.integers(0, distinct, size=distinct)])
+    series = pd.Series(rng.permutation(values).astype(str))
+
+    hll = HyperLogLog()
+    hll.add_hashes(hash_values(series))
+
+    error = abs(hll.count() - distinct) / distinct
+    assert error <= 3 * hll.relative_error
+
+
+def test_hll_small_precision_bound():
+    series = pd.Series(np.arange(200_000))
+    hll = HyperLogLog(p=10)
+    hll.add_hashes(hash_values(series))
+
+    assert abs(hll.count() - 200_000) / 200_000 <= 3 * 1.04 / np.sqrt(2 ** 10)
+
+
+def test_hll_empty_column_counts_zero():
+    hll = HyperLogLog()
+    hll.add_hashes(hash_values(pd.Series([], dtype=object)))
+    assert hll.count() == 0
+
+
+def _zipf_column(n: int, seed: int) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    return pd.Series(("v" + pd.Series(rng.zipf(1.3, size=n) % 20_000).astype(str)).to_numpy())
+
+
+@pytest.mark.parametrize("k", [10, 100, 1000])
+def test_misra_gries_counts_are_bounded_lower_bounds(k):
+    series = _zipf_column(300_000, k)
+    exact = series.value_counts()
+
+    items = FrequentItems(k=k)
+    # Several slices, so the merge step is exercised
+    for start in range(0, len(series), 70_000):
+        chunk = series.iloc[start:start + 70_000]
+        items.add(hash_values(chunk), chunk)
+
+    assert items.n == len(series)
+    assert items.max_error == len(series) // (k + 1)
+
+    reported = dict(items.top(k))
+    assert len(reported) <= k
+    for value, count in reported.items():
+        assert count <= exact[value]
+        assert exact[value] - count <= len(series) / (k + 1)
+
+    # Anything more frequent than n / (k + 1) must be reported
+    for value in exact[exact > len(series) / (k + 1)].index:
+        assert value in reported
+
+
+def test_misra_gries_exact_with_few_distinct_values():
+    series = pd.Series(["a"] * 5 + ["b"] * 3 + ["c"])
+    items = FrequentItems(k=10)
+    items.add(hash_values(series), series)
+
+    assert items.top(3) == [("a", 5), ("b", 3), ("c", 1)]
+
+
+def test_approximate_profile_reports_error_bounds():
+    series = _zipf_column(50_000, 7)
+    result = approximate_profile(series, top_n=5, chunk_rows=10_000)
+
+    assert result["approximate"] is True
+    assert result["unique_count_relative_error"] == round(1.04 / np.sqrt(2 ** 14), 4)
+    assert result["top_values_max_undercount"] == 50_000 // 1001
+    assert len(result["top_values"]) == 5
+
+
+def test_profile_columns_switches_to_sketches_above_threshold(monkeypatch):
+    rng = np.random.default_rng(0)
+    n = 20_000
+    df = pd.DataFrame({
+        "id": np.arange(n),
+        "name": pd.Series(rng.integers(0, 10_000, size=n)).astype(str),
+        "region": pd.Categorical(rng.choice(["north", "south"], size=n)),
+    })
+
+    monkeypatch.setattr(profiler, "APPROX_PROFILE_ROWS", n)
+    exact = profiler.profile_columns(df)
+    assert not any(stats.get("approximate") for stats in exact.values())
+    assert exact["name"]["unique_count"] == df["name"].nunique()
+
+    monkeypatch.setattr(profiler, "APPROX_PROFILE_ROWS", n - 1)
+    approx = profiler.profile_columns(df)
+    for col in ("id", "name"):
+        assert approx[col]["approximate"] is True
+        error = abs(approx[col]["unique_count"] - df[col].nunique()) / df[col].nunique()
+        assert error <= 3 * approx[col]["unique_count_relative_error"]
+    assert approx["name"]["top_values_max_undercount"] == n // 1001
+    # Low-cardinality columns are still counted exactly
+    assert "approximate" not in approx["region"]
+    assert approx["region"]["unique_count"] == 2
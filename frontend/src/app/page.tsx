@@ -12,6 +12,8 @@ import ChartBuilder from "@/components/ChartBuilder";
 import ExportReport from "@/components/ExportReport";
 import AskAI from "@/components/AskAI";
 
+const SUMMARY_POLL_INTERVAL_MS = 2000;
+
 export interface Message {
   role: "user" | "assistant";
   content: string;
@@ -26,6 +28,7 @@ export interface DatasetInfo {
   preview: any[];
   stats: any;
   summary?: string;
+  summary_status?: "pending" | "done" | "failed";
 }
 
 export default function Home() {
@@ -87,6 +90,46 @@ export default function Home() {
 
   }, []);
 
+  useEffect(() => {
+
+    // The dataset opens before its AI summary is written; poll until it is
+    if (!dataset || dataset.summary_status !== "pending" || !token) return;
+
+    const timer = setTimeout(async () => {
+
+      try {
+
+        const res = await fetch(
+          `https://ai-data-dashboard.onrender.com/api/upload/${dataset.id}/status`,
+          { headers: { "Authorization": `Bearer ${token}` } }
+        );
+
+        if (!res.ok) throw new Error(`Status check failed: ${res.status}`);
+
+        const status = await res.json();
+
+        setDataset((current) => {
+          if (!current || current.id !== dataset.id) return current;
+          const updated = {
+            ...current,
+            summary: status.summary ?? current.summary,
+            // Keep polling only while the status still says pending
+            summary_status: status.summary_status ?? "done",
+          };
+          localStorage.setItem("current_dataset", JSON.stringify(updated));
+          return updated;
+        });
+
+      } catch {
+        setDataset((current) => current && { ...current, summary_status: "failed" });
+      }
+
+    }, SUMMARY_POLL_INTERVAL_MS);
+
+    return () => clearTimeout(timer);
+
+  }, [dataset, token]);
+
   if (authLoading) {
     return (
       <div className="flex items-center justify-center min-h-screen text-gray-400">
@@ -1,7 +1,6 @@
 "use client";
 
 import { useState, useRef, useEffect } from "react";
-import axios from "axios";
 import { useAuth } from "@/context/AuthContext";
 import { Message } from "@/app/page";
 
@@ -25,11 +24,15 @@ export default function AskAI({ datasetId, messages, setMessages }: Props) {
   const [input, setInput] = useState("");
   const [isLoading, setIsLoading] = useState(false);
   const bottomRef = useRef<HTMLDivElement>(null);
+  const abortRef = useRef<AbortController | null>(null);
 
   useEffect(() => {
     bottomRef.current?.scrollIntoView({ behavior: "smooth" });
   }, [messages]);
 
+  // Abandoning the tab cancels the answer on the server too
+  useEffect(() => () => abortRef.current?.abort(), []);
+
   const sendMessage = async (question: string) => {
     if (!question.trim() || isLoading || !token) return;
     
@@ -39,19 +42,56 @@ export default function AskAI({ datasetId, messages, setMessages }: Props) {
     setInput("");
     setIsLoading(true);
 
+    const controller = new AbortController();
+    abortRef.current = controller;
+    let answer = "";
+
     try {
-      const res = await axios.post(`${API}/api/query`, {
-        dataset_id: datasetId,
-        question,
-        history: messages,
-      }, {
-        headers: { Authorization: `Bearer ${token}` }
+      const res = await fetch(`${API}/api/query/stream`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          Authorization: `Bearer ${token}`,
+        },
+        body: JSON.stringify({ dataset_id: datasetId, question, history: messages }),
+        signal: controller.signal,
       });
-      setMessages([...newMessages, { role: "assistant", content: res.data.answer }]);
+      if (!res.ok || !res.body) throw new Error("AI is unavailable.");
+
+      // Server-Sent Events: blank-line separated blocks of "event:"/"data:" lines
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        const events = buffer.split("\n\n");
+        buffer = events.pop() ?? "";
+
+        for (const block of events) {
+          const event = block.match(/^event: (.*)$/m)?.[1];
+          const data = block.match(/^data: (.*)$/m)?.[1];
+          if (!data) continue;
+          if (event === "error") throw new Error(JSON.parse(data).detail);
+          if (event === "done") continue;
+
+          answer += JSON.parse(data).token;
+          setMessages([...newMessages, { role: "assistant", content: answer }]);
+        }
+      }
+      if (!answer) throw new Error("Empty answer.");
     } catch {
-      setMessages([...newMessages, { role: "assistant", content: "AI is unavailable. Please try again." }]);
+      if (controller.signal.aborted) return;
+      setMessages([...newMessages, {
+        role: "assistant",
+        content: answer || "AI is unavailable. Please try again.",
+      }]);
     } finally {
       setIsLoading(false);
+      if (abortRef.current === controller) abortRef.current = null;
     }
   };
 
@@ -87,7 +127,7 @@ export default function AskAI({ datasetId, messages, setMessages }: Props) {
             </div>
           ))
         )}
-        {isLoading && <div className="text-indigo-400 text-xs animate-pulse">AI is thinking...</div>}
+        {isLoading && messages[messages.length - 1]?.role === "user" && <div className="text-indigo-400 text-xs animate-pulse">AI is thinking...</div>}
         <div ref={bottomRef} />
       </div>
       
@@ -40,6 +40,11 @@ export default function ChartBuilder({ datasetId, columns, columnTypes }: Props)
   const [sort, setSort] = useState("desc");
   const [topN, setTopN] = useState<number | "">("");
 
+  // One optional row filter, e.g. region eq EU
+  const [filterCol, setFilterCol] = useState("");
+  const [filterOp, setFilterOp] = useState("eq");
+  const [filterValue, setFilterValue] = useState("");
+
   const [chartData, setChartData] = useState<any[]>([]);
   const [chartInsight, setChartInsight] = useState<string | null>(null);
 
@@ -57,6 +62,9 @@ export default function ChartBuilder({ datasetId, columns, columnTypes }: Props)
 
       setYCol(numeric || columns[0]);
 
+      setFilterCol("");
+      setFilterValue("");
+
       setChartData([]);
       setGenerated(false);
       setError("");
@@ -86,7 +94,10 @@ export default function ChartBuilder({ datasetId, columns, columnTypes }: Props)
           chart_type: chartType,
           aggregation: aggregation,
           sort: sort,
-          top_n: topN || null
+          top_n: topN || null,
+          filters: filterCol && filterValue !== ""
+            ? [{ column: filterCol, op: filterOp, value: filterValue }]
+            : []
         },
         {
           headers: { Authorization: `Bearer ${token}` }
@@ -162,6 +173,8 @@ export default function ChartBuilder({ datasetId, columns, columnTypes }: Props)
           <option value="sum">Sum</option>
           <option value="mean">Mean</option>
           <option value="count">Count</option>
+          <option value="min">Min</option>
+          <option value="max">Max</option>
         </select>
 
 
@@ -190,6 +203,43 @@ export default function ChartBuilder({ datasetId, columns, columnTypes }: Props)
           className="bg-gray-800 border border-gray-700 rounded-lg p-2 text-sm text-white w-40"
         />
 
+        <select
+          value={filterCol}
+          onChange={(e) => setFilterCol(e.target.value)}
+          className="bg-gray-800 border border-gray-700 rounded-lg p-2 text-sm text-white"
+        >
+          <option value="">No filter</option>
+          {columns.map(c => (
+            <option key={c} value={c}>{c}</option>
+          ))}
+        </select>
+
+        {filterCol && (
+          <>
+            <select
+              value={filterOp}
+              onChange={(e) => setFilterOp(e.target.value)}
+              className="bg-gray-800 border border-gray-700 rounded-lg p-2 text-sm text-white"
+            >
+              <option value="eq">=</option>
+              <option value="ne">≠</option>
+              <option value="gt">&gt;</option>
+              <option value="ge">≥</option>
+              <option value="lt">&lt;</option>
+              <option value="le">≤</option>
+              <option value="contains">contains</option>
+            </select>
+
+            <input
+              type="text"
+              placeholder="Value"
+              value={filterValue}
+              onChange={(e) => setFilterValue(e.target.value)}
+              className="bg-gray-800 border border-gray-700 rounded-lg p-2 text-sm text-white w-40"
+            />
+          </>
+        )}
+
       </div>
 
 
@@ -9,7 +9,8 @@ import {
 interface Props {
   charts: {
     revenue_over_time?: { date: string; revenue: number }[];
-    top_products?: { product: string; revenue: number }[];
+    // Largest values first; one revenue_by_<column> per low-cardinality column
+    revenue_by_product?: { product: string; revenue: number }[];
     revenue_by_category?: { category: string; revenue: number }[];
     revenue_by_region?: { region: string; revenue: number }[];
   };
@@ -60,11 +61,11 @@ export default function Charts({ charts }: Props) {
         )}
 
         {/* Top Products by Revenue */}
-        {charts.top_products && charts.top_products.length > 0 && (
+        {charts.revenue_by_product && charts.revenue_by_product.length > 0 && (
           <div className={chartCardClass}>
             <p className="text-sm font-semibold text-white mb-4">Top Products by Revenue</p>
             <ResponsiveContainer width="100%" height={220}>
-              <BarChart data={charts.top_products} layout="vertical">
+              <BarChart data={charts.revenue_by_product.slice(0, 8)} layout="vertical">
                 <CartesianGrid strokeDasharray="3 3" stroke="#1f2937" />
                 <XAxis type="number" tick={{ fill: "#6b7280", fontSize: 11 }} />
                 <YAxis
@@ -1,12 +1,56 @@
 "use client";
 
+import { useEffect, useState } from "react";
+import axios from "axios";
 import { DatasetInfo } from "@/app/page";
+import { useAuth } from "@/context/AuthContext";
+
+const API = "https://ai-data-dashboard.onrender.com";
+const PAGE_SIZE = 50;
 
 interface Props {
   dataset: DatasetInfo;
 }
 
+interface RowsPage {
+  total: number;
+  offset: number;
+  rows: any[];
+}
+
 export default function DataTable({ dataset }: Props) {
+  const { token } = useAuth();
+  const [offset, setOffset] = useState(0);
+  // Server sort syntax: "column" ascending, "-column" descending
+  const [sort, setSort] = useState<string | null>(null);
+  const [page, setPage] = useState<RowsPage | null>(null);
+  const [loading, setLoading] = useState(false);
+
+  // A new upload starts from its first page, unsorted
+  useEffect(() => {
+    setOffset(0);
+    setSort(null);
+    setPage(null);
+  }, [dataset?.id]);
+
+  useEffect(() => {
+    if (!dataset?.id) return;
+    let cancelled = false;
+    setLoading(true);
+
+    axios
+      .get(`${API}/api/dataset/${dataset.id}/rows`, {
+        params: { offset, limit: PAGE_SIZE, ...(sort ? { sort } : {}) },
+        headers: { Authorization: `Bearer ${token}` },
+      })
+      .then((res) => { if (!cancelled) setPage(res.data); })
+      // Keep showing the upload preview if the rows can't be fetched
+      .catch((err) => console.error("Failed to load rows", err))
+      .finally(() => { if (!cancelled) setLoading(false); });
+
+    return () => { cancelled = true; };
+  }, [dataset?.id, offset, sort, token]);
+
   // Safety check to prevent reading properties of undefined
   if (!dataset || !dataset.columns || !dataset.preview) {
     return (
@@ -16,13 +60,47 @@ export default function DataTable({ dataset }: Props) {
     );
   }
 
-  const { columns, preview } = dataset;
+  const { columns } = dataset;
+  const rows = page ? page.rows : dataset.preview;
+  const total = page ? page.total : dataset.rows;
+
+  const toggleSort = (col: string) => {
+    // none -> ascending -> descending -> none
+    setSort(sort === col ? `-${col}` : sort === `-${col}` ? null : col);
+    setOffset(0);
+  };
+
+  const sortMark = (col: string) => (sort === col ? " ▲" : sort === `-${col}` ? " ▼" : "");
 
   return (
     <div className="bg-gray-900 border border-gray-800 rounded-xl overflow-hidden">
-      <div className="px-5 py-4 border-b border-gray-800">
-        <h2 className="font-semibold text-white">Data Preview</h2>
-        <p className="text-xs text-gray-500 mt-0.5">Showing first {preview.length} rows</p>
+      <div className="px-5 py-4 border-b border-gray-800 flex items-center justify-between">
+        <div>
+          <h2 className="font-semibold text-white">Data Preview</h2>
+          <p className="text-xs text-gray-500 mt-0.5">
+            {page
+              ? `Rows ${total ? offset + 1 : 0}–${offset + rows.length} of ${total.toLocaleString()}`
+              : `Showing first ${rows.length} rows`}
+          </p>
+        </div>
+        {page && (
+          <div className="flex items-center gap-2">
+            <button
+              onClick={() => setOffset(Math.max(offset - PAGE_SIZE, 0))}
+              disabled={loading || offset === 0}
+              className="px-3 py-1.5 text-xs rounded-lg bg-gray-800 text-gray-300 hover:bg-gray-700 disabled:opacity-40"
+            >
+              Previous
+            </button>
+            <button
+              onClick={() => setOffset(offset + PAGE_SIZE)}
+              disabled={loading || offset + PAGE_SIZE >= total}
+              className="px-3 py-1.5 text-xs rounded-lg bg-gray-800 text-gray-300 hover:bg-gray-700 disabled:opacity-40"
+            >
+              Next
+            </button>
+          </div>
+        )}
       </div>
 
       <div className="overflow-x-auto">
@@ -30,14 +108,18 @@ export default function DataTable({ dataset }: Props) {
           <thead>
             <tr className="bg-gray-800/60">
               {columns.map((col) => (
-                <th key={col} className="px-4 py-3 text-left text-xs font-semibold text-gray-400 uppercase tracking-wider whitespace-nowrap">
-                  {col}
+                <th
+                  key={col}
+                  onClick={() => toggleSort(col)}
+                  className="px-4 py-3 text-left text-xs font-semibold text-gray-400 uppercase tracking-wider whitespace-nowrap cursor-pointer select-none hover:text-white"
+                >
+                  {col}{sortMark(col)}
                 </th>
               ))}
             </tr>
           </thead>
-          <tbody>
-            {preview.map((row, i) => (
+          <tbody className={loading ? "opacity-60" : ""}>
+            {rows.map((row, i) => (
               <tr key={i} className="border-t border-gray-800 hover:bg-gray-800/40 transition-colors">
                 {columns.map((col) => (
                   <td key={col} className="px-4 py-3 text-gray-300 whitespace-nowrap max-w-[200px] truncate" title={String(row?.[col] ?? "")}>
@@ -53,4 +135,4 @@ export default function DataTable({ dataset }: Props) {
       </div>
     </div>
   );
-}
\ No newline at end of file
+}
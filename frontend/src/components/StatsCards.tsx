@@ -1,7 +1,7 @@
 "use client";
 
 interface ColumnStat {
-  type: "numeric" | "categorical";
+  type: "numeric" | "categorical" | "datetime";
   null_count: number;
   unique_count: number;
   mean?: number;
@@ -26,7 +26,8 @@ export default function StatsCards({ stats }: Props) {
   }
 
   const numericCols = Object.entries(stats).filter(([, s]) => s?.type === "numeric");
-  const categoricalCols = Object.entries(stats).filter(([, s]) => s?.type === "categorical");
+  // Datetime columns carry top_values too and are listed with the categoricals
+  const categoricalCols = Object.entries(stats).filter(([, s]) => s?.type === "categorical" || s?.type === "datetime");
 
   return (
     <div className="space-y-6">
@@ -6,6 +6,14 @@ import { DatasetInfo } from "@/app/page";
 import { useAuth } from "@/context/AuthContext";
 
 const API = "https://ai-data-dashboard.onrender.com";
+const POLL_INTERVAL_MS = 1000;
+// Give up on a job that never finishes (e.g. lost to a server restart)
+const MAX_WAIT_MS = 20 * 60 * 1000;
+
+const STAGE_LABELS: Record<string, string> = {
+  stored: "Upload stored, queued for analysis...",
+  profiling: "Profiling columns...",
+};
 
 interface Props {
   onUpload: (data: DatasetInfo) => void;
@@ -15,9 +23,25 @@ export default function UploadZone({ onUpload }: Props) {
   const { token } = useAuth();
   const [dragging, setDragging] = useState(false);
   const [loading, setLoading] = useState(false);
+  const [progressLabel, setProgressLabel] = useState("Uploading your CSV...");
   const [error, setError] = useState<string | null>(null);
   const inputRef = useRef<HTMLInputElement>(null);
 
+  const waitUntilReady = async (datasetId: string): Promise<DatasetInfo> => {
+    const deadline = Date.now() + MAX_WAIT_MS;
+    while (Date.now() < deadline) {
+      const res = await axios.get(`${API}/api/upload/${datasetId}/status`, {
+        headers: { "Authorization": `Bearer ${token}` },
+      });
+      const status = res.data;
+      if (status.status === "ready") return status;
+      if (status.status === "failed") throw new Error(status.error || "Processing failed.");
+      setProgressLabel(STAGE_LABELS[status.stage] ?? "Processing...");
+      await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+    }
+    throw new Error("Processing is taking too long. Please try uploading again.");
+  };
+
   const handleFile = async (file: File) => {
     if (!file.name.endsWith(".csv")) {
       setError("Please upload a .csv file.");
@@ -25,6 +49,7 @@ export default function UploadZone({ onUpload }: Props) {
     }
     setError(null);
     setLoading(true);
+    setProgressLabel("Uploading your CSV...");
 
     const formData = new FormData();
     formData.append("file", file);
@@ -36,10 +61,14 @@ export default function UploadZone({ onUpload }: Props) {
           "Authorization": `Bearer ${token}` 
         },
       });
-      onUpload({ ...res.data, filename: file.name });
+      // The upload returns once the file is stored; the dashboard opens as
+      // soon as profiling is done and the AI summary arrives after it
+      setProgressLabel(STAGE_LABELS.stored);
+      const ready = await waitUntilReady(res.data.id);
+      onUpload({ ...ready, filename: file.name });
     } catch (err: any) {
       const detail = err?.response?.data?.detail;
-      setError(detail === "Not authenticated" ? "Session expired. Please log in again." : (detail || "Upload failed."));
+      setError(detail === "Not authenticated" ? "Session expired. Please log in again." : (detail || err?.message || "Upload failed."));
     } finally {
       setLoading(false);
     }
@@ -68,7 +97,7 @@ export default function UploadZone({ onUpload }: Props) {
         {loading ? (
           <div className="space-y-3">
             <div className="w-10 h-10 border-4 border-indigo-500 border-t-transparent rounded-full animate-spin mx-auto" />
-            <p className="text-gray-400">Parsing your CSV...</p>
+            <p className="text-gray-400">{progressLabel}</p>
           </div>
         ) : (
           <div className="space-y-3">